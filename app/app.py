@@ -3,28 +3,95 @@ Flask Web Application for Soccer Analytics
 """
 
 from flask import Flask, render_template, request, jsonify
-from pymongo import MongoClient
-import pickle
+from functools import partial, wraps
 import sys
 import os
 
 # Add parent directory to path to import query functions
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from soccer_analytics.db import get_db
+from soccer_analytics.cache import ResponseCache, normalize_key
+from soccer_analytics.metadata import MetadataRegistry
+from soccer_analytics.micro_batch import MicroBatcher
+from soccer_analytics import data_version, model_artifact, prediction, queries
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
+app.config['QUERY_CACHE_SIZE'] = int(os.environ.get('QUERY_CACHE_SIZE', 256))
+app.config['QUERY_CACHE_TTL'] = int(os.environ.get('QUERY_CACHE_TTL', 3600))
+app.config['PREDICT_BATCH_LIMIT'] = int(os.environ.get('PREDICT_BATCH_LIMIT', 2000))
+# Concurrent /api/predict calls scored together: wait up to this long / this many rows (0 disables)
+app.config['PREDICT_MICROBATCH_WINDOW_MS'] = float(os.environ.get('PREDICT_MICROBATCH_WINDOW_MS', 2))
+app.config['PREDICT_MICROBATCH_ROWS'] = int(os.environ.get('PREDICT_MICROBATCH_ROWS', 64))
+
+# MongoDB connection (shared pooled client)
+db = get_db()
+
+# Query responses, dropped automatically when the importer bumps the data version
+response_cache = ResponseCache(
+    max_entries=app.config['QUERY_CACHE_SIZE'],
+    ttl=app.config['QUERY_CACHE_TTL'],
+    version_source=lambda: data_version.current(db)
+)
+
+# Dropdown lists (leagues, seasons, teams), reloaded when the data version moves
+metadata = MetadataRegistry(db)
+try:
+    metadata.refresh()
+except Exception as e:
+    print(f"Warning: Could not preload dropdown metadata: {e}")
+
+def cached_response(view):
+    """Serve repeated /api/query* requests from response_cache"""
+    @wraps(view)
+    def wrapper():
+        key = normalize_key(request.path, request.get_json(silent=True))
+        try:
+            cached = response_cache.get(key)
+        except Exception:
+            # Data version unreadable (e.g. MongoDB down): answer uncached, the view reports errors
+            return view()
+        if cached is not None:
+            body, status = cached
+            return jsonify(body), status
+        
+        # The version the view's data belongs to; set drops the response if it moves meanwhile
+        version = response_cache.version
+        response = view()
+        response, status = response if isinstance(response, tuple) else (response, 200)
+        # Errors other than "not found" are not cached
+        if status in (200, 404):
+            response_cache.set(key, (response.get_json(), status), version)
+        return response, status
+    return wrapper
 
-# MongoDB connection
-client = MongoClient('mongodb://localhost:27017/')
-db = client['soccer_analytics']
+# ML model: array artifact under data/model (rf_model.pkl for older trainings)
+MODEL_DIR = 'data/model'
+MODEL_PICKLE = os.path.join(MODEL_DIR, 'rf_model.pkl')
 
-# Load ML model
-model_path = 'data/model/rf_model.pkl'
-with open(model_path, 'rb') as f:
-    model_data = pickle.load(f)
-    ml_model = model_data['model']
-    scaler = model_data['scaler']
-    features = model_data['features']
+def load_model():
+    """Model bundle plus the registry of its all-pairs prediction matrix and a micro-batcher"""
+    bundle = model_artifact.load(MODEL_DIR, legacy_path=MODEL_PICKLE)
+    bundle['batcher'] = MicroBatcher(
+        partial(prediction.score, bundle['model'], bundle['scaler']),
+        window=app.config['PREDICT_MICROBATCH_WINDOW_MS'] / 1000,
+        max_rows=app.config['PREDICT_MICROBATCH_ROWS']
+    )
+    # All-pairs probabilities: saved with the model, rebuilt when the data version moves
+    bundle['prediction_matrix'] = prediction.PredictionMatrixRegistry(
+        db, bundle['model'], bundle['scaler'], bundle['features'], saved=bundle['prediction_matrix']
+    )
+    try:
+        bundle['prediction_matrix'].get()
+    except Exception as e:
+        print(f"Warning: Could not build the prediction matrix: {e}")
+    return bundle
+
+# Loaded in the background so pages are served right away; a prediction
+# request that arrives first waits for (or performs) the load
+ml = model_artifact.LazyModel(load_model)
+ml.warm_up()
 
 @app.route('/')
 def home():
@@ -42,10 +109,7 @@ def home():
 @app.route('/predict')
 def predict_page():
     """Match prediction page"""
-    # Get unique teams
-    teams = sorted(db.teams.distinct('team_long_name'))
-    
-    return render_template('predict.html', teams=teams)
+    return render_template('predict.html', teams=metadata.teams)
 
 @app.route('/api/predict', methods=['POST'])
 def predict_match():
@@ -57,82 +121,104 @@ def predict_match():
     
     if not home_team or not away_team:
         return jsonify({'error': 'Both teams required'}), 400
+    if not isinstance(home_team, str) or not isinstance(away_team, str):
+        return jsonify({'error': 'Team names must be strings'}), 400
     
+    # Optional match date (YYYY-MM-DD): rate the teams as they were on that day
     try:
-        # Get team attributes
-        home_team_data = db.teams.find_one({'team_long_name': home_team})
-        away_team_data = db.teams.find_one({'team_long_name': away_team})
-        
-        if not home_team_data or not away_team_data:
+        match_date = prediction.parse_match_date(data.get('date'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        model = ml.get()
+        if match_date is None:
+            # Latest attributes: precomputed, no database or model call
+            cached = model['prediction_matrix'].get().lookup(home_team, away_team)
+            if cached is not None:
+                probabilities, home_attrs, away_attrs = cached
+                return jsonify(prediction.describe(home_team, away_team, home_attrs, away_attrs, probabilities))
+        
+        teams = prediction.find_teams(db, [home_team, away_team])
+        if home_team not in teams or away_team not in teams:
             return jsonify({'error': 'Team not found'}), 404
         
-        # Get latest attributes
-        home_attrs = home_team_data['attributes_history'][-1] if home_team_data.get('attributes_history') else {}
-        away_attrs = away_team_data['attributes_history'][-1] if away_team_data.get('attributes_history') else {}
-        
-        # Calculate features
-        home_rating = (home_attrs.get('buildUpPlaySpeed', 50) + 
-                      home_attrs.get('defencePressure', 50) + 
-                      home_attrs.get('chanceCreationShooting', 50)) / 3
-        
-        away_rating = (away_attrs.get('buildUpPlaySpeed', 50) + 
-                      away_attrs.get('defencePressure', 50) + 
-                      away_attrs.get('chanceCreationShooting', 50)) / 3
-        
-        # Build feature vector
-        feature_dict = {
-            'home_rating': home_rating,
-            'away_rating': away_rating,
-            'rating_diff': home_rating - away_rating,
-            'home_build_up': home_attrs.get('buildUpPlaySpeed', 50),
-            'away_build_up': away_attrs.get('buildUpPlaySpeed', 50),
-            'home_defense': home_attrs.get('defencePressure', 50),
-            'away_defense': away_attrs.get('defencePressure', 50),
-            'home_attack': home_attrs.get('chanceCreationShooting', 50),
-            'away_attack': away_attrs.get('chanceCreationShooting', 50),
-            'attack_diff': home_attrs.get('chanceCreationShooting', 50) - away_attrs.get('chanceCreationShooting', 50),
-            'defense_diff': home_attrs.get('defencePressure', 50) - away_attrs.get('defencePressure', 50),
-            'home_advantage': 1
-        }
+        # Attributes current on the match date (latest when no date is given)
+        home_attrs = prediction.team_snapshot(teams[home_team], match_date)
+        away_attrs = prediction.team_snapshot(teams[away_team], match_date)
         
-        # Add form features if model has them
-        if 'home_form' in features:
-            feature_dict['home_form'] = 0.5
-            feature_dict['away_form'] = 0.5
-            feature_dict['form_diff'] = 0.0
+        # Scored in one batch with other requests arriving at the same moment
+        probabilities = model['batcher'].predict(
+            prediction.feature_matrix([home_attrs], [away_attrs], model['features'])
+        )
+        return jsonify(prediction.describe(home_team, away_team, home_attrs, away_attrs, probabilities[0]))
         
-        # Create feature array in correct order
-        X = [[feature_dict[f] for f in features]]
-        
-        # Scale and predict
-        X_scaled = scaler.transform(X)
-        probabilities = ml_model.predict_proba(X_scaled)[0]
-        
-        result = {
-            'home_team': home_team,
-            'away_team': away_team,
-            'probabilities': {
-                'away_win': round(probabilities[0] * 100, 2),
-                'draw': round(probabilities[1] * 100, 2),
-                'home_win': round(probabilities[2] * 100, 2)
-            },
-            'prediction': ['Away Win', 'Draw', 'Home Win'][probabilities.argmax()],
-            'confidence': round(probabilities.max() * 100, 2),
-            'team_attributes': {
-                'home': {
-                    'rating': round(home_rating, 1),
-                    'attack': home_attrs.get('chanceCreationShooting', 50),
-                    'defense': home_attrs.get('defencePressure', 50)
-                },
-                'away': {
-                    'rating': round(away_rating, 1),
-                    'attack': away_attrs.get('chanceCreationShooting', 50),
-                    'defense': away_attrs.get('defencePressure', 50)
-                }
-            }
-        }
-        
-        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many fixtures at once: {"fixtures": [{"home_team", "away_team", "date"?}, ...]}"""
+    data = request.get_json(silent=True) or {}
+    fixtures = data.get('fixtures')
+    
+    if not isinstance(fixtures, list) or not fixtures:
+        return jsonify({'error': 'fixtures must be a non-empty list'}), 400
+    if len(fixtures) > app.config['PREDICT_BATCH_LIMIT']:
+        return jsonify({'error': f"At most {app.config['PREDICT_BATCH_LIMIT']} fixtures per request"}), 400
+    
+    dates = []
+    for i, fixture in enumerate(fixtures):
+        if not isinstance(fixture, dict) or not fixture.get('home_team') or not fixture.get('away_team'):
+            return jsonify({'error': f'Fixture {i}: both teams required'}), 400
+        if not isinstance(fixture['home_team'], str) or not isinstance(fixture['away_team'], str):
+            return jsonify({'error': f'Fixture {i}: team names must be strings'}), 400
+        try:
+            dates.append(prediction.parse_match_date(fixture.get('date')))
+        except ValueError as e:
+            return jsonify({'error': f'Fixture {i}: {e}'}), 400
+    
+    try:
+        model = ml.get()
+        results = [
+            {'home_team': fixture['home_team'], 'away_team': fixture['away_team'], 'error': 'Team not found'}
+            for fixture in fixtures
+        ]
+        
+        # Undated fixtures of known teams come straight from the precomputed matrix
+        matrix = model['prediction_matrix'].get()
+        live = []
+        for i, fixture in enumerate(fixtures):
+            cached = matrix.lookup(fixture['home_team'], fixture['away_team']) if dates[i] is None else None
+            if cached is None:
+                live.append(i)
+            else:
+                probabilities, home, away = cached
+                results[i] = prediction.describe(fixture['home_team'], fixture['away_team'], home, away, probabilities)
+        
+        # The rest: every team in one query, every known fixture in one predict_proba call
+        teams = prediction.find_teams(
+            db, [fixtures[i][side] for i in live for side in ('home_team', 'away_team')]
+        ) if live else {}
+        scored = [
+            i for i in live
+            if fixtures[i]['home_team'] in teams and fixtures[i]['away_team'] in teams
+        ]
+        home_attrs = [prediction.team_snapshot(teams[fixtures[i]['home_team']], dates[i]) for i in scored]
+        away_attrs = [prediction.team_snapshot(teams[fixtures[i]['away_team']], dates[i]) for i in scored]
+        
+        if scored:
+            probabilities = prediction.predict_probabilities(
+                model['model'], model['scaler'], model['features'], home_attrs, away_attrs
+            )
+            for row, i in enumerate(scored):
+                results[i] = prediction.describe(
+                    fixtures[i]['home_team'], fixtures[i]['away_team'],
+                    home_attrs[row], away_attrs[row], probabilities[row]
+                )
+        
+        not_found = sum(1 for result in results if 'error' in result)
+        return jsonify({'predictions': results, 'scored': len(fixtures) - not_found, 'not_found': not_found})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -140,22 +226,16 @@ def predict_match():
 @app.route('/queries')
 def queries_page():
     """Queries demonstration page"""
-    # Get available leagues and seasons
-    leagues = sorted(db.leagues.distinct('name'))
-    seasons = sorted(db.matches.distinct('season'), reverse=True)
-    teams = sorted(db.teams.distinct('team_long_name'))
-    
-    return render_template('queries.html', leagues=leagues, seasons=seasons, teams=teams)
+    return render_template('queries.html', **metadata.get())
 
 
 @app.route('/query1')
 def query1_page():
     """Query 1: Team Performance"""
-    leagues = sorted(db.leagues.distinct('name'))
-    seasons = sorted(db.matches.distinct('season'), reverse=True)
-    return render_template('query1.html', leagues=leagues, seasons=seasons)
+    return render_template('query1.html', leagues=metadata.leagues, seasons=metadata.seasons)
 
 @app.route('/api/query1', methods=['POST'])
+@cached_response
 def api_query1():
     """API endpoint for Query 1"""
     data = request.get_json()
@@ -163,88 +243,12 @@ def api_query1():
     season = data.get('season')
     
     try:
-        matches = db.matches.find({
-            'league_name': league,
-            'season': season
-        })
+        result = queries.team_performance(league, season)
         
-        teams = {}
-        
-        for match in matches:
-            home_team = match['home_team']['name']
-            away_team = match['away_team']['name']
-            home_goals = match.get('home_team_goal', 0)
-            away_goals = match.get('away_team_goal', 0)
-            
-            # Initialize teams
-            if home_team not in teams:
-                teams[home_team] = {
-                    'team': home_team,
-                    'played': 0,
-                    'wins': 0,
-                    'draws': 0,
-                    'losses': 0,
-                    'goals_for': 0,
-                    'goals_against': 0,
-                    'goal_diff': 0,
-                    'points': 0
-                }
-            
-            if away_team not in teams:
-                teams[away_team] = {
-                    'team': away_team,
-                    'played': 0,
-                    'wins': 0,
-                    'draws': 0,
-                    'losses': 0,
-                    'goals_for': 0,
-                    'goals_against': 0,
-                    'goal_diff': 0,
-                    'points': 0
-                }
-            
-            # Update stats
-            teams[home_team]['played'] += 1
-            teams[home_team]['goals_for'] += home_goals
-            teams[home_team]['goals_against'] += away_goals
-            
-            teams[away_team]['played'] += 1
-            teams[away_team]['goals_for'] += away_goals
-            teams[away_team]['goals_against'] += home_goals
-            
-            # Results
-            if home_goals > away_goals:
-                teams[home_team]['wins'] += 1
-                teams[home_team]['points'] += 3
-                teams[away_team]['losses'] += 1
-            elif home_goals < away_goals:
-                teams[away_team]['wins'] += 1
-                teams[away_team]['points'] += 3
-                teams[home_team]['losses'] += 1
-            else:
-                teams[home_team]['draws'] += 1
-                teams[home_team]['points'] += 1
-                teams[away_team]['draws'] += 1
-                teams[away_team]['points'] += 1
+        if result is None:
+            return jsonify({'error': f'No matches found for {league} {season}'}), 404
         
-        # Calculate goal difference
-        for team in teams.values():
-            team['goal_diff'] = team['goals_for'] - team['goals_against']
-        
-        # Sort standings
-        standings = sorted(teams.values(), 
-                          key=lambda x: (x['points'], x['goal_diff']), 
-                          reverse=True)
-        
-        # Get summary stats
-        top_scorer = max(teams.values(), key=lambda x: x['goals_for'])
-        best_defense = min(teams.values(), key=lambda x: x['goals_against'])
-        
-        return jsonify({
-            'standings': standings,
-            'top_scorer': top_scorer,
-            'best_defense': best_defense
-        })
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -254,11 +258,10 @@ def api_query1():
 @app.route('/query2')
 def query2_page():
     """Query 2: Home vs Away Performance"""
-    leagues = sorted(db.leagues.distinct('name'))
-    seasons = sorted(db.matches.distinct('season'), reverse=True)
-    return render_template('query2.html', leagues=leagues, seasons=seasons)
+    return render_template('query2.html', leagues=metadata.leagues, seasons=metadata.seasons)
 
 @app.route('/api/query2', methods=['POST'])
+@cached_response
 def api_query2():
     """API endpoint for Query 2"""
     data = request.get_json()
@@ -266,102 +269,12 @@ def api_query2():
     season = data.get('season')
     
     try:
-        matches = db.matches.find({
-            'league_name': league,
-            'season': season
-        })
-        
-        teams = {}
-        
-        for match in matches:
-            home_team = match['home_team']['name']
-            away_team = match['away_team']['name']
-            home_goals = match.get('home_team_goal', 0)
-            away_goals = match.get('away_team_goal', 0)
-            
-            # Initialize teams
-            if home_team not in teams:
-                teams[home_team] = {
-                    'team': home_team,
-                    'home_played': 0,
-                    'home_wins': 0,
-                    'home_draws': 0,
-                    'home_losses': 0,
-                    'home_points': 0,
-                    'away_played': 0,
-                    'away_wins': 0,
-                    'away_draws': 0,
-                    'away_losses': 0,
-                    'away_points': 0
-                }
-            
-            if away_team not in teams:
-                teams[away_team] = {
-                    'team': away_team,
-                    'home_played': 0,
-                    'home_wins': 0,
-                    'home_draws': 0,
-                    'home_losses': 0,
-                    'home_points': 0,
-                    'away_played': 0,
-                    'away_wins': 0,
-                    'away_draws': 0,
-                    'away_losses': 0,
-                    'away_points': 0
-                }
-            
-            # Update home team (playing at home)
-            teams[home_team]['home_played'] += 1
-            if home_goals > away_goals:
-                teams[home_team]['home_wins'] += 1
-                teams[home_team]['home_points'] += 3
-            elif home_goals == away_goals:
-                teams[home_team]['home_draws'] += 1
-                teams[home_team]['home_points'] += 1
-            else:
-                teams[home_team]['home_losses'] += 1
-            
-            # Update away team (playing away)
-            teams[away_team]['away_played'] += 1
-            if away_goals > home_goals:
-                teams[away_team]['away_wins'] += 1
-                teams[away_team]['away_points'] += 3
-            elif away_goals == home_goals:
-                teams[away_team]['away_draws'] += 1
-                teams[away_team]['away_points'] += 1
-            else:
-                teams[away_team]['away_losses'] += 1
-        
-        # Calculate percentages
-        results = []
-        for team_data in teams.values():
-            home_win_pct = round((team_data['home_wins'] / team_data['home_played'] * 100), 1) if team_data['home_played'] > 0 else 0
-            away_win_pct = round((team_data['away_wins'] / team_data['away_played'] * 100), 1) if team_data['away_played'] > 0 else 0
-            home_advantage = round(home_win_pct - away_win_pct, 1)
-            
-            results.append({
-                'team': team_data['team'],
-                'home_win_pct': home_win_pct,
-                'away_win_pct': away_win_pct,
-                'home_advantage': home_advantage,
-                'home_points': team_data['home_points'],
-                'away_points': team_data['away_points']
-            })
+        result = queries.home_away_performance(league, season)
         
-        # Sort by home advantage
-        results.sort(key=lambda x: x['home_advantage'], reverse=True)
+        if result is None:
+            return jsonify({'error': f'No matches found for {league} {season}'}), 404
         
-        # Summary stats
-        best_home = results[0]
-        worst_home = results[-1]
-        avg_advantage = round(sum(r['home_advantage'] for r in results) / len(results), 1)
-        
-        return jsonify({
-            'results': results,
-            'best_home': best_home,
-            'worst_home': worst_home,
-            'avg_advantage': avg_advantage
-        })
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -370,11 +283,10 @@ def api_query2():
 @app.route('/query3')
 def query3_page():
     """Query 3: Head-to-Head Records"""
-    teams = sorted(db.teams.distinct('team_long_name'))
-    leagues = sorted(db.leagues.distinct('name'))
-    return render_template('query3.html', teams=teams, leagues=leagues)
+    return render_template('query3.html', teams=metadata.teams, leagues=metadata.leagues)
 
 @app.route('/api/query3', methods=['POST'])
+@cached_response
 def api_query3():
     """API endpoint for Query 3"""
     data = request.get_json()
@@ -383,92 +295,12 @@ def api_query3():
     league = data.get('league', '')
     
     try:
-        # Build query
-        query = {
-            '$or': [
-                {'home_team.name': team1, 'away_team.name': team2},
-                {'home_team.name': team2, 'away_team.name': team1}
-            ]
-        }
-        
-        if league:
-            query['league_name'] = league
+        result = queries.head_to_head(team1, team2, league or None)
         
-        # Get matches
-        matches = list(db.matches.find(query).sort('date', 1))
-        
-        if not matches:
+        if result is None:
             return jsonify({'error': f'No matches found between {team1} and {team2}'}), 404
         
-        # Calculate stats
-        team1_wins = 0
-        team2_wins = 0
-        draws = 0
-        team1_goals = 0
-        team2_goals = 0
-        
-        match_details = []
-        
-        for match in matches:
-            home = match['home_team']['name']
-            away = match['away_team']['name']
-            home_goals = match.get('home_team_goal', 0)
-            away_goals = match.get('away_team_goal', 0)
-            
-            # Determine result from team1's perspective
-            if home == team1:
-                team1_goals += home_goals
-                team2_goals += away_goals
-                if home_goals > away_goals:
-                    team1_wins += 1
-                    result = f"{team1} win"
-                elif home_goals < away_goals:
-                    team2_wins += 1
-                    result = f"{team2} win"
-                else:
-                    draws += 1
-                    result = "Draw"
-            else:
-                team1_goals += away_goals
-                team2_goals += home_goals
-                if away_goals > home_goals:
-                    team1_wins += 1
-                    result = f"{team1} win"
-                elif away_goals < home_goals:
-                    team2_wins += 1
-                    result = f"{team2} win"
-                else:
-                    draws += 1
-                    result = "Draw"
-            
-            match_details.append({
-                'date': match['date'].strftime('%Y-%m-%d') if hasattr(match['date'], 'strftime') else str(match['date'])[:10],
-                'season': match['season'],
-                'home': home,
-                'away': away,
-                'score': f"{home_goals}-{away_goals}",
-                'result': result
-            })
-        
-        total_matches = len(matches)
-        team1_win_pct = round((team1_wins / total_matches * 100), 1)
-        team2_win_pct = round((team2_wins / total_matches * 100), 1)
-        draw_pct = round((draws / total_matches * 100), 1)
-        
-        return jsonify({
-            'team1': team1,
-            'team2': team2,
-            'total_matches': total_matches,
-            'team1_wins': team1_wins,
-            'team2_wins': team2_wins,
-            'draws': draws,
-            'team1_goals': team1_goals,
-            'team2_goals': team2_goals,
-            'team1_win_pct': team1_win_pct,
-            'team2_win_pct': team2_win_pct,
-            'draw_pct': draw_pct,
-            'matches': match_details
-        })
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -477,11 +309,10 @@ def api_query3():
 @app.route('/query4')
 def query4_page():
     """Query 4: Player Appearance Frequency"""
-    leagues = sorted(db.leagues.distinct('name'))
-    seasons = sorted(db.matches.distinct('season'), reverse=True)
-    return render_template('query4.html', leagues=leagues, seasons=seasons)
+    return render_template('query4.html', leagues=metadata.leagues, seasons=metadata.seasons)
 
 @app.route('/api/query4', methods=['POST'])
+@cached_response
 def api_query4():
     """API endpoint for Query 4"""
     data = request.get_json()
@@ -490,68 +321,7 @@ def api_query4():
     limit = data.get('limit', 15)
     
     try:
-        matches = db.matches.find({
-            'league_name': league,
-            'season': season
-        })
-        
-        player_stats = {}
-        total_matches = 0
-        
-        for match in matches:
-            total_matches += 1
-            
-            # Process home lineup
-            for player in match.get('home_lineup', []):
-                name = player.get('player_name')
-                if name:
-                    if name not in player_stats:
-                        player_stats[name] = {
-                            'player': name,
-                            'appearances': 0,
-                            'teams': set()
-                        }
-                    player_stats[name]['appearances'] += 1
-                    player_stats[name]['teams'].add(match['home_team']['name'])
-            
-            # Process away lineup
-            for player in match.get('away_lineup', []):
-                name = player.get('player_name')
-                if name:
-                    if name not in player_stats:
-                        player_stats[name] = {
-                            'player': name,
-                            'appearances': 0,
-                            'teams': set()
-                        }
-                    player_stats[name]['appearances'] += 1
-                    player_stats[name]['teams'].add(match['away_team']['name'])
-        
-        # Convert teams set to string
-        for player in player_stats.values():
-            player['teams'] = ', '.join(sorted(player['teams']))
-        
-        # Sort by appearances
-        top_players = sorted(player_stats.values(), 
-                            key=lambda x: x['appearances'], 
-                            reverse=True)[:limit]
-        
-        # Count regulars (30+ appearances)
-        regulars_count = sum(1 for p in player_stats.values() if p['appearances'] >= 30)
-        
-        # Total matches is half of what we counted (each match counted twice - home and away)
-        actual_total_matches = total_matches // 2 if total_matches > 0 else 0
-        # Actually, let's get accurate count
-        actual_total_matches = db.matches.count_documents({
-            'league_name': league,
-            'season': season
-        })
-        
-        return jsonify({
-            'players': top_players,
-            'total_matches': actual_total_matches,
-            'regulars_count': regulars_count
-        })
+        return jsonify(queries.player_appearances(league, season, limit))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -560,12 +330,10 @@ def api_query4():
 @app.route('/query5')
 def query5_page():
     """Query 5: Team Form Analysis"""
-    leagues = sorted(db.leagues.distinct('name'))
-    seasons = sorted(db.matches.distinct('season'), reverse=True)
-    teams = sorted(db.teams.distinct('team_long_name'))
-    return render_template('query5.html', leagues=leagues, seasons=seasons, teams=teams)
+    return render_template('query5.html', **metadata.get())
 
 @app.route('/api/query5', methods=['POST'])
+@cached_response
 def api_query5():
     """API endpoint for Query 5"""
     data = request.get_json()
@@ -575,102 +343,12 @@ def api_query5():
     last_n = data.get('last_n', 10)
     
     try:
-        # Get all matches for this team
-        matches = list(db.matches.find({
-            'league_name': league,
-            'season': season,
-            '$or': [
-                {'home_team.name': team},
-                {'away_team.name': team}
-            ]
-        }).sort('date', 1))
+        result = queries.team_form(team, league, season, last_n)
         
-        if not matches:
+        if result is None:
             return jsonify({'error': f'No matches found for {team}'}), 404
         
-        # Get last N matches
-        recent_matches = matches[-last_n:] if len(matches) >= last_n else matches
-        
-        # Analyze form
-        form_string = ""
-        wins = 0
-        draws = 0
-        losses = 0
-        goals_for = 0
-        goals_against = 0
-        
-        match_details = []
-        
-        for match in recent_matches:
-            home = match['home_team']['name']
-            away = match['away_team']['name']
-            home_goals = match.get('home_team_goal', 0)
-            away_goals = match.get('away_team_goal', 0)
-            
-            # Determine result from team's perspective
-            if home == team:
-                goals_for += home_goals
-                goals_against += away_goals
-                if home_goals > away_goals:
-                    form_string += "W"
-                    wins += 1
-                    result = "Win"
-                elif home_goals < away_goals:
-                    form_string += "L"
-                    losses += 1
-                    result = "Loss"
-                else:
-                    form_string += "D"
-                    draws += 1
-                    result = "Draw"
-                opponent = away
-                venue = "Home"
-                score = f"{home_goals}-{away_goals}"
-            else:
-                goals_for += away_goals
-                goals_against += home_goals
-                if away_goals > home_goals:
-                    form_string += "W"
-                    wins += 1
-                    result = "Win"
-                elif away_goals < home_goals:
-                    form_string += "L"
-                    losses += 1
-                    result = "Loss"
-                else:
-                    form_string += "D"
-                    draws += 1
-                    result = "Draw"
-                opponent = home
-                venue = "Away"
-                score = f"{away_goals}-{home_goals}"
-            
-            match_details.append({
-                'date': match['date'].strftime('%Y-%m-%d') if hasattr(match['date'], 'strftime') else str(match['date'])[:10],
-                'opponent': opponent,
-                'venue': venue,
-                'score': score,
-                'result': result
-            })
-        
-        points = wins * 3 + draws
-        max_points = len(recent_matches) * 3
-        goal_diff = goals_for - goals_against
-        
-        return jsonify({
-            'team': team,
-            'matches_analyzed': len(recent_matches),
-            'form': form_string,
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'goals_for': goals_for,
-            'goals_against': goals_against,
-            'goal_diff': goal_diff,
-            'points': points,
-            'max_points': max_points,
-            'matches': match_details
-        })
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -678,11 +356,10 @@ def api_query5():
 @app.route('/query6')
 def query6_page():
     """Query 6: Scoring Analysis"""
-    leagues = sorted(db.leagues.distinct('name'))
-    seasons = sorted(db.matches.distinct('season'), reverse=True)
-    return render_template('query6.html', leagues=leagues, seasons=seasons)
+    return render_template('query6.html', leagues=metadata.leagues, seasons=metadata.seasons)
 
 @app.route('/api/query6', methods=['POST'])
+@cached_response
 def api_query6():
     """API endpoint for Query 6"""
     data = request.get_json()
@@ -690,78 +367,12 @@ def api_query6():
     season = data.get('season')
     
     try:
-        matches = db.matches.find({
-            'league_name': league,
-            'season': season
-        })
-        
-        teams = {}
+        result = queries.scoring_analysis(league, season)
         
-        for match in matches:
-            home_team = match['home_team']['name']
-            away_team = match['away_team']['name']
-            home_goals = match.get('home_team_goal', 0)
-            away_goals = match.get('away_team_goal', 0)
-            
-            # Initialize teams
-            if home_team not in teams:
-                teams[home_team] = {
-                    'team': home_team,
-                    'matches': 0,
-                    'goals_scored': 0,
-                    'goals_conceded': 0
-                }
-            
-            if away_team not in teams:
-                teams[away_team] = {
-                    'team': away_team,
-                    'matches': 0,
-                    'goals_scored': 0,
-                    'goals_conceded': 0
-                }
-            
-            # Update stats
-            teams[home_team]['matches'] += 1
-            teams[home_team]['goals_scored'] += home_goals
-            teams[home_team]['goals_conceded'] += away_goals
-            
-            teams[away_team]['matches'] += 1
-            teams[away_team]['goals_scored'] += away_goals
-            teams[away_team]['goals_conceded'] += home_goals
+        if result is None:
+            return jsonify({'error': f'No matches found for {league} {season}'}), 404
         
-        # Calculate averages
-        results = []
-        for team_data in teams.values():
-            avg_scored = round(team_data['goals_scored'] / team_data['matches'], 2)
-            avg_conceded = round(team_data['goals_conceded'] / team_data['matches'], 2)
-            
-            results.append({
-                'team': team_data['team'],
-                'matches': team_data['matches'],
-                'goals_scored': team_data['goals_scored'],
-                'goals_conceded': team_data['goals_conceded'],
-                'avg_scored': avg_scored,
-                'avg_conceded': avg_conceded
-            })
-        
-        # Sort by different criteria
-        best_attack = sorted(results, key=lambda x: x['avg_scored'], reverse=True)
-        best_defense = sorted(results, key=lambda x: x['avg_conceded'])
-        worst_defense = sorted(results, key=lambda x: x['avg_conceded'], reverse=True)
-        
-        # Summary
-        summary = {
-            'best_attack': best_attack[0],
-            'best_defense': best_defense[0],
-            'worst_defense': worst_defense[0]
-        }
-        
-        return jsonify({
-            'best_attack': best_attack,
-            'best_defense': best_defense,
-            'worst_defense': worst_defense,
-            'summary': summary
-        })
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -770,11 +381,10 @@ def api_query6():
 @app.route('/query7')
 def query7_page():
     """Query 7: Attributes Correlation"""
-    leagues = sorted(db.leagues.distinct('name'))
-    seasons = sorted(db.matches.distinct('season'), reverse=True)
-    return render_template('query7.html', leagues=leagues, seasons=seasons)
+    return render_template('query7.html', leagues=metadata.leagues, seasons=metadata.seasons)
 
 @app.route('/api/query7', methods=['POST'])
+@cached_response
 def api_query7():
     """API endpoint for Query 7"""
     data = request.get_json()
@@ -782,131 +392,16 @@ def api_query7():
     season = data.get('season')
     
     try:
-        # Get team attributes
-        teams_data = {}
-        for team in db.teams.find():
-            if team.get('attributes_history'):
-                latest_attrs = team['attributes_history'][-1]
-                teams_data[team['team_api_id']] = {
-                    'name': team['team_long_name'],
-                    'buildUpPlaySpeed': latest_attrs.get('buildUpPlaySpeed', 50),
-                    'defencePressure': latest_attrs.get('defencePressure', 50),
-                    'chanceCreationShooting': latest_attrs.get('chanceCreationShooting', 50)
-                }
-        
-        # Analyze matches
-        matches = db.matches.find({
-            'league_name': league,
-            'season': season
-        })
-        
-        analysis = {
-            'total_matches': 0,
-            'stronger_wins': 0,
-            'weaker_wins': 0,
-            'draws': 0,
-            'rating_buckets': {}
-        }
-        
-        for match in matches:
-            home_id = match.get('home_team_api_id')
-            away_id = match.get('away_team_api_id')
-            
-            if home_id not in teams_data or away_id not in teams_data:
-                continue
-            
-            home_attrs = teams_data[home_id]
-            away_attrs = teams_data[away_id]
-            
-            # Calculate overall ratings
-            home_rating = (home_attrs['buildUpPlaySpeed'] + 
-                          home_attrs['defencePressure'] + 
-                          home_attrs['chanceCreationShooting']) / 3
-            
-            away_rating = (away_attrs['buildUpPlaySpeed'] + 
-                          away_attrs['defencePressure'] + 
-                          away_attrs['chanceCreationShooting']) / 3
-            
-            rating_diff = home_rating - away_rating
-            
-            home_goals = match.get('home_team_goal', 0)
-            away_goals = match.get('away_team_goal', 0)
-            
-            # Determine outcome
-            if home_goals > away_goals:
-                outcome = 'home_win'
-            elif away_goals > home_goals:
-                outcome = 'away_win'
-            else:
-                outcome = 'draw'
-            
-            # Count results
-            analysis['total_matches'] += 1
-            
-            if outcome == 'draw':
-                analysis['draws'] += 1
-            elif (outcome == 'home_win' and rating_diff > 0) or \
-                 (outcome == 'away_win' and rating_diff < 0):
-                analysis['stronger_wins'] += 1
-            else:
-                analysis['weaker_wins'] += 1
-            
-            # Bucket by rating difference (5-point intervals)
-            bucket = int(rating_diff / 5) * 5
-            if bucket not in analysis['rating_buckets']:
-                analysis['rating_buckets'][bucket] = {
-                    'matches': 0,
-                    'stronger_wins': 0,
-                    'weaker_wins': 0,
-                    'draws': 0
-                }
-            
-            analysis['rating_buckets'][bucket]['matches'] += 1
-            
-            if outcome == 'draw':
-                analysis['rating_buckets'][bucket]['draws'] += 1
-            elif (outcome == 'home_win' and rating_diff > 0) or \
-                 (outcome == 'away_win' and rating_diff < 0):
-                analysis['rating_buckets'][bucket]['stronger_wins'] += 1
-            else:
-                analysis['rating_buckets'][bucket]['weaker_wins'] += 1
-        
-        # Calculate percentages
-        total = analysis['total_matches']
-        stronger_win_pct = round((analysis['stronger_wins'] / total * 100), 1) if total > 0 else 0
-        weaker_win_pct = round((analysis['weaker_wins'] / total * 100), 1) if total > 0 else 0
-        draw_pct = round((analysis['draws'] / total * 100), 1) if total > 0 else 0
-        
-        # Format buckets
-        buckets = []
-        for bucket_val, stats in sorted(analysis['rating_buckets'].items()):
-            if stats['matches'] > 0:
-                stronger_pct = round((stats['stronger_wins'] / stats['matches'] * 100), 1)
-                upset_pct = round((stats['weaker_wins'] / stats['matches'] * 100), 1)
-                bucket_draw_pct = round((stats['draws'] / stats['matches'] * 100), 1)
-                
-                buckets.append({
-                    'bucket_range': f"{bucket_val:+d} to {bucket_val+5:+d}",
-                    'matches': stats['matches'],
-                    'stronger_win_pct': stronger_pct,
-                    'upset_pct': upset_pct,
-                    'draw_pct': bucket_draw_pct
-                })
-        
-        return jsonify({
-            'total_matches': analysis['total_matches'],
-            'stronger_wins': analysis['stronger_wins'],
-            'weaker_wins': analysis['weaker_wins'],
-            'draws': analysis['draws'],
-            'stronger_win_pct': stronger_win_pct,
-            'weaker_win_pct': weaker_win_pct,
-            'draw_pct': draw_pct,
-            'buckets': buckets
-        })
+        return jsonify(queries.attributes_correlation(league, season))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache/stats')
+def cache_stats():
+    """Response cache hit/miss counters"""
+    return jsonify(response_cache.stats())
+
 if __name__ == '__main__':
     print("\n" + "="*70)
     print("Starting Soccer Analytics Web Application")
@@ -0,0 +1,89 @@
+"""
+Benchmark Model Inference
+Times the trained model (data/model/rf_model.pkl) through sklearn
+(scaler.transform + predict_proba) and through the flattened array model
+the app serves (model_artifact.ArrayModel), one row at a time and as one
+batch, on the training feature matrix. Exits non-zero if the two paths do
+not give bit-identical probabilities.
+"""
+
+import argparse
+import pickle
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add project root to path to import the shared package
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from soccer_analytics import feature_store, model_artifact
+from soccer_analytics.db import get_db
+
+
+def timed(function, rows, repeat):
+    """Best-of-`repeat` seconds per call of function over each row"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            function(row)
+        best = min(best, (time.perf_counter() - start) / len(rows))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', default=os.path.join('data', 'model', 'rf_model.pkl'),
+                        help='pickled model_data written by the training scripts')
+    parser.add_argument('--rows', type=int, default=500, help='rows timed one at a time (default 500)')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs, best is reported (default 3)')
+    args = parser.parse_args()
+
+    with open(args.model, 'rb') as f:
+        model_data = pickle.load(f)
+    model, scaler, feature_names = model_data['model'], model_data['scaler'], model_data['features']
+
+    try:
+        arrays, header = model_artifact.export(model, scaler)
+    except ValueError as e:
+        print(f"✗ {type(model).__name__} cannot be exported as arrays: {e}")
+        sys.exit(1)
+    flat = model_artifact.ArrayModel(header['kind'], arrays, header)
+    if flat.scaler_folded:
+        flat_proba = flat.predict_proba_unscaled
+    else:
+        array_scaler = model_artifact.ArrayScaler(arrays['scaler_mean'], arrays['scaler_scale'])
+        flat_proba = lambda X: flat.predict_proba(array_scaler.transform(X))
+    sklearn_proba = lambda X: model.predict_proba(scaler.transform(X))
+
+    df, _ = feature_store.load_features(get_db(), with_form='home_form' in feature_names)
+    X = df[feature_names].to_numpy(dtype=np.float64)
+    if not len(X):
+        print("✗ No matches found - import data first")
+        sys.exit(1)
+    print(f"{model_data.get('model_name') or type(model).__name__}: {header['kind']}, {len(X)} rows")
+
+    mismatches = int((sklearn_proba(X) != flat_proba(X)).any(axis=1).sum())
+    singles = X[np.linspace(0, len(X) - 1, min(args.rows, len(X))).astype(np.int64)].reshape(-1, 1, X.shape[1])
+    mismatches += sum(not np.array_equal(sklearn_proba(row), flat_proba(row)) for row in singles)
+
+    results = {}
+    for name, proba in (('sklearn', sklearn_proba), ('flat', flat_proba)):
+        results[name] = (timed(proba, singles, args.repeat), timed(proba, [X], args.repeat))
+
+    print(f"\n{'Path':<10} {'Single row':>14} {'Batch of ' + str(len(X)):>20}")
+    for name, (single, batch) in results.items():
+        print(f"{name:<10} {single * 1e6:>11.1f} µs {batch * 1e3:>17.1f} ms")
+    print(f"{'speedup':<10} {results['sklearn'][0] / results['flat'][0]:>13.1f}x "
+          f"{results['sklearn'][1] / results['flat'][1]:>19.1f}x\n")
+
+    if mismatches:
+        print(f"✗ {mismatches} predictions differ from sklearn")
+        sys.exit(1)
+    print("✓ Probabilities are bit-identical to sklearn")
+
+
+if __name__ == "__main__":
+    main()
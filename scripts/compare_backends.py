@@ -0,0 +1,81 @@
+"""
+Compare Query Backends
+Runs the backend-dependent queries (1, 2, 4, 5, 6, 7) for every league
+season with each backend and exits non-zero if any result differs from
+the reference backend's.
+"""
+
+import argparse
+import json
+import sys
+import os
+
+# Add project root to path to import the shared package
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from soccer_analytics import queries
+from soccer_analytics.db import get_db
+
+
+def query_calls(db):
+    """(label, function, args) for every league season and team"""
+    calls = []
+    for league in sorted(db.matches.distinct('league_name')):
+        for season in sorted(db.matches.distinct('season', {'league_name': league})):
+            calls += [
+                (f'query1 {league} {season}', queries.team_performance, (league, season)),
+                (f'query2 {league} {season}', queries.home_away_performance, (league, season)),
+                (f'query4 {league} {season}', queries.player_appearances, (league, season)),
+                (f'query5 {league} {season}', queries.league_form, (league, season)),
+                (f'query6 {league} {season}', queries.scoring_analysis, (league, season)),
+                (f'query7 {league} {season}', queries.attributes_correlation, (league, season)),
+            ]
+            teams = db.matches.distinct('home_team.name', {'league_name': league, 'season': season})
+            for team in sorted(teams):
+                calls.append((f'query5 {team} {season}', queries.team_form, (team, league, season)))
+    return calls
+
+
+def canonical(result):
+    """JSON text of a result, as the API would serialize it"""
+    return json.dumps(result, sort_keys=True, default=str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reference', default='pipeline', choices=sorted(queries.BACKENDS),
+                        help='backend whose results are taken as correct (default pipeline)')
+    parser.add_argument('--backends', nargs='+', choices=sorted(queries.BACKENDS),
+                        help='backends to check (default: all others)')
+    args = parser.parse_args()
+
+    db = get_db()
+    calls = query_calls(db)
+    if not calls:
+        print("✗ No league seasons found - import data first")
+        sys.exit(1)
+
+    reference = queries.BACKENDS[args.reference](db)
+    expected = [canonical(function(*call_args, backend=reference)) for _, function, call_args in calls]
+
+    failed = False
+    for name in args.backends or sorted(set(queries.BACKENDS) - {args.reference}):
+        backend = queries.BACKENDS[name](db)
+        mismatches = [
+            label for (label, function, call_args), want in zip(calls, expected)
+            if canonical(function(*call_args, backend=backend)) != want
+        ]
+        if mismatches:
+            failed = True
+            print(f"✗ {name}: {len(mismatches)} of {len(calls)} results differ from {args.reference}")
+            for label in mismatches[:10]:
+                print(f"    {label}")
+        else:
+            print(f"✓ {name}: all {len(calls)} results match {args.reference}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,27 @@
+import argparse
+import hashlib
+import json
+import queue
 import sqlite3
-from pymongo import MongoClient
+import threading
+import time
+from pymongo import DeleteMany, MongoClient, ReplaceOne
 from datetime import datetime
 import sys
+import os
+
+# Add project root to path to import the shared package
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from soccer_analytics import data_version, indexes, match_events, odds, team_season_stats
+from soccer_analytics.projections import HASH_FIELD, RESULT_FIELDS
+
+# Rows fetched from SQLite and documents buffered per insert_many
+CHUNK_SIZE = 1000
+
+# match_events / match_odds documents ride along with their match until it is written
+SIDE_FIELD = '_side'
+SIDE_COLLECTIONS = (match_events.COLLECTION, odds.COLLECTION)
 
 def connect_sqlite(db_path='./database.sqlite'):
     """Connect to SQLite database"""
@@ -29,10 +49,8 @@ def parse_date(date_str):
     except:
         return date_str
 
-def convert_leagues_and_countries(sqlite_conn, mongo_db):
-    """Import leagues and countries"""
-    print("\n=== Converting Countries and Leagues ===")
-    
+def read_leagues(sqlite_conn):
+    """League rows with their country name"""
     # Get countries first
     cursor = sqlite_conn.execute("SELECT * FROM Country")
     countries = [dict_from_row(row) for row in cursor.fetchall()]
@@ -48,102 +66,288 @@ def convert_leagues_and_countries(sqlite_conn, mongo_db):
     for row in cursor.fetchall():
         league_doc = dict_from_row(row)
         leagues.append(league_doc)
+    return leagues
+
+def convert_leagues_and_countries(sqlite_conn, mongo_db):
+    """Import leagues and countries"""
+    print("\n=== Converting Countries and Leagues ===")
     
+    leagues = list(with_content_hash(read_leagues(sqlite_conn)))
     if leagues:
         mongo_db.leagues.insert_many(leagues)
         print(f"✓ Imported {len(leagues)} leagues")
     else:
         print("✗ No leagues found")
 
-def convert_teams(sqlite_conn, mongo_db):
-    """Import teams with embedded attributes"""
-    print("\n=== Converting Teams ===")
+def iter_rows(cursor, chunk_size=CHUNK_SIZE):
+    """Yield rows as dictionaries, fetching chunk_size rows at a time"""
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        for row in rows:
+            yield dict_from_row(row)
+
+def content_hash(doc):
+    """Stable digest of a document (ignores _id and the stored hash)"""
+    payload = {k: v for k, v in doc.items() if k not in ('_id', HASH_FIELD)}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+def with_content_hash(documents):
+    """Stamp every document with its content hash"""
+    for doc in documents:
+        doc[HASH_FIELD] = content_hash(doc)
+        yield doc
+
+def merge_attributes(entities, attributes, key):
+    """
+    Attach attribute rows to their entity with an ordered merge
+    Both iterables must be sorted on key; yields each entity with
+    entity['attributes_history'] filled in date order.
+    """
+    attributes = iter(attributes)
+    attr = next(attributes, None)
+    for entity in entities:
+        entity['attributes_history'] = []
+        entity_id = entity.get(key)
+        if entity_id is not None:
+            # Skip attribute rows whose entity does not exist
+            while attr is not None and attr[key] < entity_id:
+                attr = next(attributes, None)
+            while attr is not None and attr[key] == entity_id:
+                attr['date'] = parse_date(attr.get('date'))
+                entity['attributes_history'].append(attr)
+                attr = next(attributes, None)
+        yield entity
+
+def iter_batches(documents, batch_size=CHUNK_SIZE):
+    """Group a document stream into lists of at most batch_size"""
+    batch = []
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_in_batches(write, documents, batch_size=CHUNK_SIZE, label='documents', workers=1, verb='Inserted'):
+    """
+    Call write(batch) for every batch of a document stream
+    The calling thread reads and converts rows into batches. With workers > 1
+    the batches go through a bounded queue to that many writer threads, so
+    SQLite reads overlap with MongoDB writes. Returns (written, seconds).
+    """
+    started = time.perf_counter()
     
-    # Get all teams
-    cursor = sqlite_conn.execute("SELECT * FROM Team")
-    teams_dict = {}
-    for row in cursor.fetchall():
-        team = dict_from_row(row)
-        team['attributes_history'] = []
-        teams_dict[team['team_api_id']] = team
+    if workers <= 1:
+        total = 0
+        for batch in iter_batches(documents, batch_size):
+            write(batch)
+            total += len(batch)
+            print(f"  {verb} {total} {label} so far...")
+        return total, time.perf_counter() - started
     
-    print(f"Found {len(teams_dict)} teams")
+    # At most two batches per worker wait in memory
+    batches = queue.Queue(maxsize=workers * 2)
+    lock = threading.Lock()
+    progress = {'total': 0, 'error': None}
     
-    # Get team attributes
-    cursor = sqlite_conn.execute("SELECT * FROM Team_Attributes ORDER BY date")
-    attr_count = 0
-    for row in cursor.fetchall():
-        attr = dict_from_row(row)
-        team_api_id = attr.get('team_api_id')
-        if team_api_id and team_api_id in teams_dict:
-            attr['date'] = parse_date(attr.get('date'))
-            teams_dict[team_api_id]['attributes_history'].append(attr)
-            attr_count += 1
-    
-    print(f"Found {attr_count} team attribute records")
-    
-    teams_list = list(teams_dict.values())
-    if teams_list:
-        mongo_db.teams.insert_many(teams_list)
-        print(f"✓ Imported {len(teams_list)} teams with attributes")
+    def consume():
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if progress['error'] is not None:
+                # Keep draining so the producer never blocks on a full queue
+                continue
+            try:
+                write(batch)
+            except Exception as e:
+                progress['error'] = e
+                continue
+            with lock:
+                progress['total'] += len(batch)
+                total = progress['total']
+            print(f"  {verb} {total} {label} so far...")
+    
+    threads = [threading.Thread(target=consume, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for batch in iter_batches(documents, batch_size):
+            if progress['error'] is not None:
+                break
+            batches.put(batch)
+    finally:
+        for _ in threads:
+            batches.put(None)
+        for thread in threads:
+            thread.join()
+    
+    if progress['error'] is not None:
+        raise progress['error']
+    return progress['total'], time.perf_counter() - started
+
+def insert_in_batches(collection, documents, batch_size=CHUNK_SIZE, label='documents', workers=1):
+    """Insert a stream of documents with unordered insert_many"""
+    def insert(batch):
+        collection.insert_many(batch, ordered=False)
+    return write_in_batches(insert, documents, batch_size, label, workers)
+
+def format_rate(total, seconds):
+    """docs/sec for the throughput report"""
+    return f"{total / seconds:,.0f} docs/sec" if seconds > 0 else "n/a"
+
+def iter_entity_documents(sqlite_conn, entity_table, attr_table, key, chunk_size=CHUNK_SIZE):
+    """Stream an entity table merged with its attributes table, ordered by key"""
+    entities = iter_rows(
+        sqlite_conn.execute(f"SELECT * FROM {entity_table} ORDER BY {key}"), chunk_size
+    )
+    attributes = iter_rows(
+        sqlite_conn.execute(
+            f"SELECT * FROM {attr_table} WHERE {key} IS NOT NULL ORDER BY {key}, date, id"
+        ),
+        chunk_size
+    )
+    return with_content_hash(merge_attributes(entities, attributes, key))
+
+def convert_with_attributes(sqlite_conn, collection, entity_table, attr_table, key, label,
+                            chunk_size=CHUNK_SIZE, workers=1):
+    """Import an entity table merged with its attributes table into collection"""
+    counts = {'attributes': 0}
+    def documents():
+        for entity in iter_entity_documents(sqlite_conn, entity_table, attr_table, key, chunk_size):
+            counts['attributes'] += len(entity['attributes_history'])
+            yield entity
+    
+    total, seconds = insert_in_batches(collection, documents(), chunk_size, label, workers)
+    print(f"Found {counts['attributes']} {label[:-1]} attribute records")
+    return total, seconds
+
+def convert_teams(sqlite_conn, mongo_db, chunk_size=CHUNK_SIZE, workers=1):
+    """Import teams with embedded attributes"""
+    print("\n=== Converting Teams ===")
+    
+    total, seconds = convert_with_attributes(
+        sqlite_conn, mongo_db.teams, 'Team', 'Team_Attributes', 'team_api_id', 'teams', chunk_size, workers
+    )
+    if total:
+        print(f"✓ Imported {total} teams with attributes ({format_rate(total, seconds)})")
     else:
         print("✗ No teams found")
+    return total, seconds
 
-def convert_players(sqlite_conn, mongo_db):
+def convert_players(sqlite_conn, mongo_db, chunk_size=CHUNK_SIZE, workers=1):
     """Import players with embedded attributes"""
     print("\n=== Converting Players ===")
     
-    # Get all players
-    cursor = sqlite_conn.execute("SELECT * FROM Player")
-    players_dict = {}
-    for row in cursor.fetchall():
-        player = dict_from_row(row)
-        player['attributes_history'] = []
-        players_dict[player['player_api_id']] = player
-    
-    print(f"Found {len(players_dict)} players")
-    
-    # Get player attributes
-    cursor = sqlite_conn.execute("SELECT * FROM Player_Attributes ORDER BY date")
-    attr_count = 0
-    for row in cursor.fetchall():
-        attr = dict_from_row(row)
-        player_api_id = attr.get('player_api_id')
-        if player_api_id and player_api_id in players_dict:
-            attr['date'] = parse_date(attr.get('date'))
-            players_dict[player_api_id]['attributes_history'].append(attr)
-            attr_count += 1
-    
-    print(f"Found {attr_count} player attribute records")
-    
-    players_list = list(players_dict.values())
-    if players_list:
-        # Insert in batches to avoid memory issues
-        batch_size = 1000
-        for i in range(0, len(players_list), batch_size):
-            batch = players_list[i:i+batch_size]
-            mongo_db.players.insert_many(batch)
-            print(f"  Inserted {min(i+batch_size, len(players_list))}/{len(players_list)} players...")
-        print(f"✓ Imported {len(players_list)} players with attributes")
+    total, seconds = convert_with_attributes(
+        sqlite_conn, mongo_db.players, 'Player', 'Player_Attributes', 'player_api_id', 'players', chunk_size, workers
+    )
+    if total:
+        print(f"✓ Imported {total} players with attributes ({format_rate(total, seconds)})")
     else:
         print("✗ No players found")
+    return total, seconds
 
-def convert_matches(sqlite_conn, mongo_db):
-    """Import matches with denormalized team and player info"""
-    print("\n=== Converting Matches ===")
+def load_team_names(sqlite_conn):
+    """team_api_id -> (long name, short name)"""
+    cursor = sqlite_conn.execute("SELECT team_api_id, team_long_name, team_short_name FROM Team")
+    return {row[0]: (row[1], row[2]) for row in cursor if row[0] is not None}
+
+def load_player_names(sqlite_conn):
+    """player_api_id -> player name"""
+    cursor = sqlite_conn.execute("SELECT player_api_id, player_name FROM Player")
+    return {row[0]: row[1] for row in cursor if row[0] is not None}
+
+def build_match_document(match_doc, teams_lookup, players_lookup):
+    """Denormalize one Match row: parsed date, embedded teams and lineups"""
+    # Parse date
+    if match_doc.get('date'):
+        match_doc['date'] = parse_date(match_doc['date'])
+    
+    # Move the raw event XML and the bookmaker odds out of the match document
+    match_odds = odds.extract_odds(match_doc)
+    match_doc[SIDE_FIELD] = {
+        match_events.COLLECTION: match_events.extract_events(match_doc),
+        odds.COLLECTION: [match_odds] if match_odds else []
+    }
+    
+    # Embed home team info
+    home_team_api_id = match_doc.get('home_team_api_id')
+    if home_team_api_id and home_team_api_id in teams_lookup:
+        name, short_name = teams_lookup[home_team_api_id]
+        match_doc['home_team'] = {
+            'api_id': home_team_api_id,
+            'name': name,
+            'short_name': short_name
+        }
+    else:
+        match_doc['home_team'] = {
+            'api_id': home_team_api_id,
+            'name': 'Unknown',
+            'short_name': 'UNK'
+        }
+    
+    # Embed away team info
+    away_team_api_id = match_doc.get('away_team_api_id')
+    if away_team_api_id and away_team_api_id in teams_lookup:
+        name, short_name = teams_lookup[away_team_api_id]
+        match_doc['away_team'] = {
+            'api_id': away_team_api_id,
+            'name': name,
+            'short_name': short_name
+        }
+    else:
+        match_doc['away_team'] = {
+            'api_id': away_team_api_id,
+            'name': 'Unknown',
+            'short_name': 'UNK'
+        }
+    
+    # Embed home lineup (player names) - using home_player_1 through home_player_11
+    match_doc['home_lineup'] = []
+    for i in range(1, 12):
+        player_api_id = match_doc.get(f'home_player_{i}')
+        if player_api_id and player_api_id in players_lookup:
+            match_doc['home_lineup'].append({
+                'player_api_id': player_api_id,
+                'player_name': players_lookup[player_api_id],
+                'position': i
+            })
+    
+    # Embed away lineup (player names) - using away_player_1 through away_player_11
+    match_doc['away_lineup'] = []
+    for i in range(1, 12):
+        player_api_id = match_doc.get(f'away_player_{i}')
+        if player_api_id and player_api_id in players_lookup:
+            match_doc['away_lineup'].append({
+                'player_api_id': player_api_id,
+                'player_name': players_lookup[player_api_id],
+                'position': i
+            })
     
-    # Get teams lookup
+    return match_doc
+
+def pop_side_documents(match_docs):
+    """Detach events and odds from a batch of match documents, by collection"""
+    side = {collection: [] for collection in SIDE_COLLECTIONS}
+    for doc in match_docs:
+        for collection, docs in doc.pop(SIDE_FIELD, {}).items():
+            side[collection].extend(docs)
+    return side
+
+def iter_match_documents(sqlite_conn, chunk_size=CHUNK_SIZE):
+    """Stream denormalized match documents"""
+    # Compact id -> name maps straight from SQLite (no attribute histories)
     print("Building team lookup...")
-    teams_lookup = {}
-    for team in mongo_db.teams.find():
-        teams_lookup[team['team_api_id']] = team
+    teams_lookup = load_team_names(sqlite_conn)
     print(f"Loaded {len(teams_lookup)} teams")
     
-    # Get players lookup
     print("Building player lookup...")
-    players_lookup = {}
-    for player in mongo_db.players.find():
-        players_lookup[player['player_api_id']] = player
+    players_lookup = load_player_names(sqlite_conn)
     print(f"Loaded {len(players_lookup)} players")
     
     # Get matches with league and country info
@@ -157,125 +361,200 @@ def convert_matches(sqlite_conn, mongo_db):
         LEFT JOIN Country c ON m.country_id = c.id
     """)
     
-    matches = []
-    match_count = 0
-    
     print("Converting match records...")
-    for row in cursor.fetchall():
-        match_doc = dict_from_row(row)
-        
-        # Parse date
-        if match_doc.get('date'):
-            match_doc['date'] = parse_date(match_doc['date'])
-        
-        # Embed home team info
-        home_team_api_id = match_doc.get('home_team_api_id')
-        if home_team_api_id and home_team_api_id in teams_lookup:
-            team = teams_lookup[home_team_api_id]
-            match_doc['home_team'] = {
-                'api_id': home_team_api_id,
-                'name': team.get('team_long_name'),
-                'short_name': team.get('team_short_name')
-            }
-        else:
-            match_doc['home_team'] = {
-                'api_id': home_team_api_id,
-                'name': 'Unknown',
-                'short_name': 'UNK'
-            }
-        
-        # Embed away team info
-        away_team_api_id = match_doc.get('away_team_api_id')
-        if away_team_api_id and away_team_api_id in teams_lookup:
-            team = teams_lookup[away_team_api_id]
-            match_doc['away_team'] = {
-                'api_id': away_team_api_id,
-                'name': team.get('team_long_name'),
-                'short_name': team.get('team_short_name')
-            }
-        else:
-            match_doc['away_team'] = {
-                'api_id': away_team_api_id,
-                'name': 'Unknown',
-                'short_name': 'UNK'
-            }
-        
-        # Embed home lineup (player names) - using home_player_1 through home_player_11
-        match_doc['home_lineup'] = []
-        for i in range(1, 12):
-            player_api_id = match_doc.get(f'home_player_{i}')
-            if player_api_id and player_api_id in players_lookup:
-                player = players_lookup[player_api_id]
-                match_doc['home_lineup'].append({
-                    'player_api_id': player_api_id,
-                    'player_name': player.get('player_name'),
-                    'position': i
-                })
-        
-        # Embed away lineup (player names) - using away_player_1 through away_player_11
-        match_doc['away_lineup'] = []
-        for i in range(1, 12):
-            player_api_id = match_doc.get(f'away_player_{i}')
-            if player_api_id and player_api_id in players_lookup:
-                player = players_lookup[player_api_id]
-                match_doc['away_lineup'].append({
-                    'player_api_id': player_api_id,
-                    'player_name': player.get('player_name'),
-                    'position': i
-                })
-        
-        matches.append(match_doc)
-        match_count += 1
-        
-        # Batch insert every 1000 matches
-        if len(matches) >= 1000:
-            mongo_db.matches.insert_many(matches)
-            print(f"  Inserted {match_count} matches so far...")
-            matches = []
+    return with_content_hash(
+        build_match_document(row, teams_lookup, players_lookup)
+        for row in iter_rows(cursor, chunk_size)
+    )
+
+def convert_matches(sqlite_conn, mongo_db, chunk_size=CHUNK_SIZE, workers=1):
+    """Import matches with denormalized team and player info"""
+    print("\n=== Converting Matches ===")
+    
+    def insert_matches(batch):
+        side = pop_side_documents(batch)
+        mongo_db.matches.insert_many(batch, ordered=False)
+        for collection, docs in side.items():
+            if docs:
+                mongo_db[collection].insert_many(docs, ordered=False)
     
-    # Insert remaining matches
-    if matches:
-        mongo_db.matches.insert_many(matches)
+    documents = iter_match_documents(sqlite_conn, chunk_size)
+    total, seconds = write_in_batches(insert_matches, documents, chunk_size, 'matches', workers)
     
     total_matches = mongo_db.matches.count_documents({})
-    print(f"✓ Total matches imported: {total_matches}")
+    total_events = mongo_db[match_events.COLLECTION].count_documents({})
+    total_odds = mongo_db[odds.COLLECTION].count_documents({})
+    print(f"✓ Total matches imported: {total_matches} ({format_rate(total, seconds)})")
+    print(f"✓ Parsed {total_events} match events")
+    print(f"✓ Moved odds for {total_odds} matches to {odds.COLLECTION}")
+    return total, seconds
+
+def sync_collection(collection, documents, key, label, chunk_size=CHUNK_SIZE, workers=1, on_changes=None):
+    """
+    Upsert only new or changed documents and delete the ones gone from SQLite
+    Documents are matched on key and compared by content hash; writes are
+    unordered bulk_write batches. on_changes(pairs) is called before each batch
+    is written with (old, new) pairs, old projected to RESULT_FIELDS and
+    old/new None for inserts/deletes; it may strip fields from new and may
+    return a callable, which runs once the batch's bulk_write has succeeded.
+    Returns a dict of inserted/updated/unchanged/deleted counts.
+    """
+    existing = {
+        doc[key]: doc.get(HASH_FIELD)
+        for doc in collection.find({}, {'_id': 0, key: 1, HASH_FIELD: 1})
+    }
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    
+    def changed():
+        for doc in documents:
+            doc_id = doc[key]
+            if doc_id in existing:
+                # Whatever is left in existing afterwards was removed from SQLite
+                if existing.pop(doc_id) == doc[HASH_FIELD]:
+                    counts['unchanged'] += 1
+                    continue
+                counts['updated'] += 1
+            else:
+                counts['inserted'] += 1
+            yield doc
+    
+    def old_documents(ids):
+        fields = dict(RESULT_FIELDS, **{key: 1})
+        return {doc[key]: doc for doc in collection.find({key: {'$in': ids}}, fields)}
+    
+    def write(operations, pairs):
+        written = on_changes(pairs) if on_changes is not None else None
+        # bulk_write raises on failure, so written only sees applied batches
+        collection.bulk_write(operations, ordered=False)
+        if written is not None:
+            written()
+    
+    def upsert(batch):
+        old = old_documents([doc[key] for doc in batch]) if on_changes is not None else {}
+        write(
+            [ReplaceOne({key: doc[key]}, doc, upsert=True) for doc in batch],
+            [(old.get(doc[key]), doc) for doc in batch]
+        )
+    
+    write_in_batches(upsert, changed(), chunk_size, label, workers, verb='Upserted')
+    
+    removed = list(existing)
+    for start in range(0, len(removed), chunk_size):
+        ids = removed[start:start + chunk_size]
+        old = old_documents(ids).values() if on_changes is not None else ()
+        write([DeleteMany({key: {'$in': ids}})], [(doc, None) for doc in old])
+    counts['deleted'] = len(removed)
+    
+    return counts
+
+def incremental_import(sqlite_conn, mongo_db, chunk_size=CHUNK_SIZE, workers=1, apply_stats=True):
+    """
+    Bring MongoDB in line with SQLite without dropping anything
+    Once a batch of matches is written, its changes are applied to
+    team_season_stats as deltas (unless apply_stats is off) and its events
+    and odds are replaced, so the app keeps serving while the refresh runs.
+    """
+    def update_stats(pairs):
+        side = pop_side_documents(new for _, new in pairs if new is not None)
+        
+        def written():
+            match_ids = [(new or old)['match_api_id'] for old, new in pairs]
+            for collection, docs in side.items():
+                mongo_db[collection].delete_many({'match_api_id': {'$in': match_ids}})
+                if docs:
+                    mongo_db[collection].insert_many(docs, ordered=False)
+            if apply_stats:
+                team_season_stats.apply_match_changes(mongo_db, pairs)
+        return written
+    
+    report = {}
+    for label, collection, key, documents, on_changes in (
+        ('leagues', mongo_db.leagues, 'id', lambda: with_content_hash(read_leagues(sqlite_conn)), None),
+        ('teams', mongo_db.teams, 'team_api_id',
+         lambda: iter_entity_documents(sqlite_conn, 'Team', 'Team_Attributes', 'team_api_id', chunk_size), None),
+        ('players', mongo_db.players, 'player_api_id',
+         lambda: iter_entity_documents(sqlite_conn, 'Player', 'Player_Attributes', 'player_api_id', chunk_size), None),
+        ('matches', mongo_db.matches, 'match_api_id',
+         lambda: iter_match_documents(sqlite_conn, chunk_size), update_stats),
+    ):
+        print(f"\n=== Syncing {label.capitalize()} ===")
+        counts = sync_collection(collection, documents(), key, label, chunk_size, workers, on_changes)
+        print(f"✓ {counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['deleted']} deleted, {counts['unchanged']} unchanged")
+        report[label] = counts
+    return report
+
+def build_team_season_stats(mongo_db):
+    """Materialize per-team league-season counters used by queries 1, 2 and 6"""
+    print("\n=== Building Team Season Stats ===")
+    
+    row_count = team_season_stats.build(mongo_db)
+    print(f"✓ Built {row_count} team-season rows")
 
 def create_indexes(mongo_db):
     """Create indexes for optimized queries"""
     print("\n=== Creating Indexes ===")
     
     try:
-        # Match indexes
-        mongo_db.matches.create_index([("date", 1)])
-        mongo_db.matches.create_index([("league_id", 1)])
-        mongo_db.matches.create_index([("season", 1)])
-        mongo_db.matches.create_index([("home_team.name", 1)])
-        mongo_db.matches.create_index([("away_team.name", 1)])
-        mongo_db.matches.create_index([("league_name", 1)])
-        mongo_db.matches.create_index([("home_team_api_id", 1)])
-        mongo_db.matches.create_index([("away_team_api_id", 1)])
-        print("  ✓ Match indexes created")
-        
-        # Player indexes
-        mongo_db.players.create_index([("player_name", 1)])
-        mongo_db.players.create_index([("player_api_id", 1)])
-        print("  ✓ Player indexes created")
-        
-        # Team indexes
-        mongo_db.teams.create_index([("team_long_name", 1)])
-        mongo_db.teams.create_index([("team_api_id", 1)])
-        print("  ✓ Team indexes created")
-        
-        # League indexes
-        mongo_db.leagues.create_index([("name", 1)])
-        print("  ✓ League indexes created")
-        
-        print("✓ All indexes created successfully")
+        created = indexes.create_indexes(mongo_db)
+        print(f"✓ {len(created)} indexes created successfully")
     except Exception as e:
         print(f"Warning: Error creating indexes: {e}")
 
+def verify_indexes(mongo_db):
+    """Check every registered query shape is served by an index"""
+    print("\n=== Verifying Query Plans ===")
+    
+    try:
+        report = indexes.verify_query_plans(mongo_db)
+    except Exception as e:
+        print(f"Warning: Could not verify query plans: {e}")
+        return
+    
+    for name, stages, ok in report:
+        print(f"  {'✓' if ok else '✗'} {name}: {' > '.join(reversed(stages))}")
+    
+    if not all(ok for _, _, ok in report):
+        print("Warning: some query shapes use COLLSCAN or an in-memory SORT")
+
+def run_incremental(sqlite_conn, mongo_db, args):
+    """--incremental: sync changed rows in place and bump the data version"""
+    # Upserts look documents up by api id, so make sure the indexes exist first
+    create_indexes(mongo_db)
+    # Deltas need existing counters; without any, rebuild from the synced matches
+    rebuild_stats = mongo_db[team_season_stats.COLLECTION].find_one({}, {'_id': 1}) is None
+    report = incremental_import(sqlite_conn, mongo_db, args.chunk_size, args.workers,
+                                apply_stats=not rebuild_stats)
+    if rebuild_stats:
+        build_team_season_stats(mongo_db)
+    
+    changed = sum(
+        counts['inserted'] + counts['updated'] + counts['deleted'] for counts in report.values()
+    )
+    if changed or rebuild_stats:
+        version = data_version.bump(mongo_db, 'incremental import')
+        print(f"\n✓ Data version bumped to {version}")
+    
+    print("\n" + "=" * 60)
+    print("INCREMENTAL IMPORT SUMMARY")
+    print("=" * 60)
+    for label, counts in report.items():
+        print(f"{label:<9} +{counts['inserted']} ~{counts['updated']} -{counts['deleted']} "
+              f"({counts['unchanged']} unchanged)")
+    print("=" * 60)
+    print(f"\n✓ {changed} documents changed" if changed else "\n✓ Already up to date")
+
 def main():
     """Main conversion process"""
+    parser = argparse.ArgumentParser(description='Import the European Soccer SQLite database into MongoDB')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'rows read from SQLite and documents buffered per insert (default {CHUNK_SIZE})')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='concurrent insert_many threads per collection (1 = serial, default 4)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='upsert changed rows (by content hash) instead of dropping and reloading')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("SQLite to MongoDB Conversion Script")
     print("European Soccer Database")
@@ -286,22 +565,38 @@ def main():
         sqlite_conn = connect_sqlite()
         mongo_db = connect_mongo()
         
+        if args.incremental:
+            run_incremental(sqlite_conn, mongo_db, args)
+            sqlite_conn.close()
+            return
+        
         # Drop existing collections for clean import
         print("\nDropping existing collections...")
         mongo_db.leagues.drop()
         mongo_db.teams.drop()
         mongo_db.players.drop()
         mongo_db.matches.drop()
+        mongo_db[team_season_stats.COLLECTION].drop()
+        mongo_db[match_events.COLLECTION].drop()
+        mongo_db[odds.COLLECTION].drop()
         print("✓ Collections cleared")
         
         # Convert data in order (leagues first, then teams, players, matches)
         convert_leagues_and_countries(sqlite_conn, mongo_db)
-        convert_teams(sqlite_conn, mongo_db)
-        convert_players(sqlite_conn, mongo_db)
-        convert_matches(sqlite_conn, mongo_db)
+        throughput = {
+            'teams': convert_teams(sqlite_conn, mongo_db, args.chunk_size, args.workers),
+            'players': convert_players(sqlite_conn, mongo_db, args.chunk_size, args.workers),
+            'matches': convert_matches(sqlite_conn, mongo_db, args.chunk_size, args.workers)
+        }
+        build_team_season_stats(mongo_db)
         
         # Create indexes
         create_indexes(mongo_db)
+        verify_indexes(mongo_db)
+        
+        # Tell running apps to drop cached responses
+        version = data_version.bump(mongo_db, 'full import')
+        print(f"\n✓ Data version bumped to {version}")
         
         # Print summary
         print("\n" + "=" * 60)
@@ -311,11 +606,18 @@ def main():
         print(f"Teams:    {mongo_db.teams.count_documents({})}")
         print(f"Players:  {mongo_db.players.count_documents({})}")
         print(f"Matches:  {mongo_db.matches.count_documents({})}")
+        print(f"Team seasons: {mongo_db[team_season_stats.COLLECTION].count_documents({})}")
+        print(f"Match events: {mongo_db[match_events.COLLECTION].count_documents({})}")
+        print(f"Match odds:   {mongo_db[odds.COLLECTION].count_documents({})}")
+        print("=" * 60)
+        print(f"THROUGHPUT ({args.workers} insert worker{'s' if args.workers != 1 else ''})")
+        for collection, (total, seconds) in throughput.items():
+            print(f"{collection:<9} {total:>7} docs in {seconds:6.1f}s  {format_rate(total, seconds)}")
         print("=" * 60)
         print("\n✓ Conversion complete!")
         print("\nYou can now connect to MongoDB and run queries!")
         print("Database name: soccer_analytics")
-        print("Collections: leagues, teams, players, matches")
+        print("Collections: leagues, teams, players, matches, team_season_stats, match_events, match_odds")
         
         # Close connections
         sqlite_conn.close()
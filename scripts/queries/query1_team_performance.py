@@ -3,7 +3,13 @@ Query 1: Team Performance by Season
 Calculates wins, draws, losses, goals, and points for each team
 """
 
-from pymongo import MongoClient
+import sys
+import os
+
+# Add project root to path to import the shared query engine
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from soccer_analytics.queries import team_performance
 
 def get_team_performance(league_name, season):
     """Get team performance statistics for a league and season"""
@@ -14,88 +20,9 @@ def get_team_performance(league_name, season):
     print(f"Season: {season}")
     print(f"{'='*70}\n")
     
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    # Get all matches for this league and season
-    matches = db.matches.find({
-        'league_name': league_name,
-        'season': season
-    })
-    
-    teams = {}
-    
-    print("Analyzing matches...\n")
-    
-    for match in matches:
-        home_team = match['home_team']['name']
-        away_team = match['away_team']['name']
-        home_goals = match.get('home_team_goal', 0)
-        away_goals = match.get('away_team_goal', 0)
-        
-        # Initialize teams if not seen before
-        if home_team not in teams:
-            teams[home_team] = {
-                'team': home_team,
-                'played': 0,
-                'wins': 0,
-                'draws': 0,
-                'losses': 0,
-                'goals_for': 0,
-                'goals_against': 0,
-                'goal_diff': 0,
-                'points': 0
-            }
-        
-        if away_team not in teams:
-            teams[away_team] = {
-                'team': away_team,
-                'played': 0,
-                'wins': 0,
-                'draws': 0,
-                'losses': 0,
-                'goals_for': 0,
-                'goals_against': 0,
-                'goal_diff': 0,
-                'points': 0
-            }
-        
-        # Update home team stats
-        teams[home_team]['played'] += 1
-        teams[home_team]['goals_for'] += home_goals
-        teams[home_team]['goals_against'] += away_goals
-        
-        # Update away team stats
-        teams[away_team]['played'] += 1
-        teams[away_team]['goals_for'] += away_goals
-        teams[away_team]['goals_against'] += home_goals
-        
-        # Determine result
-        if home_goals > away_goals:
-            teams[home_team]['wins'] += 1
-            teams[home_team]['points'] += 3
-            teams[away_team]['losses'] += 1
-        elif home_goals < away_goals:
-            teams[away_team]['wins'] += 1
-            teams[away_team]['points'] += 3
-            teams[home_team]['losses'] += 1
-        else:
-            teams[home_team]['draws'] += 1
-            teams[home_team]['points'] += 1
-            teams[away_team]['draws'] += 1
-            teams[away_team]['points'] += 1
-    
-    # Calculate goal difference
-    for team in teams.values():
-        team['goal_diff'] = team['goals_for'] - team['goals_against']
-    
-    # Sort by points, then goal difference
-    standings = sorted(teams.values(), 
-                      key=lambda x: (x['points'], x['goal_diff']), 
-                      reverse=True)
+    result = team_performance(league_name, season)
     
-    client.close()
-    return standings
+    return result['standings'] if result else []
 
 
 def print_results(standings):
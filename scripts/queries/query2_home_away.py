@@ -3,7 +3,13 @@ Query 2: Home vs Away Performance Analysis
 Shows how teams perform at home vs away
 """
 
-from pymongo import MongoClient
+import sys
+import os
+
+# Add project root to path to import the shared query engine
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from soccer_analytics.queries import home_away_performance
 
 def get_home_away_performance(league_name, season):
     """Analyze home vs away performance for all teams"""
@@ -14,102 +20,9 @@ def get_home_away_performance(league_name, season):
     print(f"Season: {season}")
     print(f"{'='*70}\n")
     
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    matches = db.matches.find({
-        'league_name': league_name,
-        'season': season
-    })
-    
-    teams = {}
-    
-    print("Analyzing home and away records...\n")
-    
-    for match in matches:
-        home_team = match['home_team']['name']
-        away_team = match['away_team']['name']
-        home_goals = match.get('home_team_goal', 0)
-        away_goals = match.get('away_team_goal', 0)
-        
-        # Initialize teams
-        if home_team not in teams:
-            teams[home_team] = {
-                'team': home_team,
-                'home_played': 0,
-                'home_wins': 0,
-                'home_draws': 0,
-                'home_losses': 0,
-                'home_points': 0,
-                'away_played': 0,
-                'away_wins': 0,
-                'away_draws': 0,
-                'away_losses': 0,
-                'away_points': 0
-            }
-        
-        if away_team not in teams:
-            teams[away_team] = {
-                'team': away_team,
-                'home_played': 0,
-                'home_wins': 0,
-                'home_draws': 0,
-                'home_losses': 0,
-                'home_points': 0,
-                'away_played': 0,
-                'away_wins': 0,
-                'away_draws': 0,
-                'away_losses': 0,
-                'away_points': 0
-            }
-        
-        # Update home team (playing at home)
-        teams[home_team]['home_played'] += 1
-        if home_goals > away_goals:
-            teams[home_team]['home_wins'] += 1
-            teams[home_team]['home_points'] += 3
-        elif home_goals == away_goals:
-            teams[home_team]['home_draws'] += 1
-            teams[home_team]['home_points'] += 1
-        else:
-            teams[home_team]['home_losses'] += 1
-        
-        # Update away team (playing away)
-        teams[away_team]['away_played'] += 1
-        if away_goals > home_goals:
-            teams[away_team]['away_wins'] += 1
-            teams[away_team]['away_points'] += 3
-        elif away_goals == home_goals:
-            teams[away_team]['away_draws'] += 1
-            teams[away_team]['away_points'] += 1
-        else:
-            teams[away_team]['away_losses'] += 1
-    
-    # Calculate win percentages and home advantage
-    results = []
-    for team_data in teams.values():
-        home_win_pct = (team_data['home_wins'] / team_data['home_played'] * 100) if team_data['home_played'] > 0 else 0
-        away_win_pct = (team_data['away_wins'] / team_data['away_played'] * 100) if team_data['away_played'] > 0 else 0
-        home_advantage = home_win_pct - away_win_pct
-        
-        results.append({
-            'team': team_data['team'],
-            'home_wins': team_data['home_wins'],
-            'home_played': team_data['home_played'],
-            'home_win_pct': round(home_win_pct, 1),
-            'away_wins': team_data['away_wins'],
-            'away_played': team_data['away_played'],
-            'away_win_pct': round(away_win_pct, 1),
-            'home_advantage': round(home_advantage, 1),
-            'home_points': team_data['home_points'],
-            'away_points': team_data['away_points']
-        })
-    
-    # Sort by home advantage
-    results.sort(key=lambda x: x['home_advantage'], reverse=True)
+    result = home_away_performance(league_name, season)
     
-    client.close()
-    return results
+    return result['results'] if result else []
 
 
 def print_results(results):
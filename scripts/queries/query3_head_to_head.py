@@ -3,7 +3,13 @@ Query 3: Head-to-Head Historical Record
 Shows all matches and statistics between two specific teams
 """
 
-from pymongo import MongoClient
+import sys
+import os
+
+# Add project root to path to import the shared query engine
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from soccer_analytics.queries import head_to_head
 from datetime import datetime
 
 def get_head_to_head(team1, team2, league_name=None):
@@ -16,92 +22,11 @@ def get_head_to_head(team1, team2, league_name=None):
         print(f"League: {league_name}")
     print(f"{'='*70}\n")
     
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    # Build query
-    query = {
-        '$or': [
-            {'home_team.name': team1, 'away_team.name': team2},
-            {'home_team.name': team2, 'away_team.name': team1}
-        ]
-    }
-    
-    if league_name:
-        query['league_name'] = league_name
-    
-    # Get all matches between these teams
-    matches = list(db.matches.find(query).sort('date', 1))
+    summary = head_to_head(team1, team2, league_name)
     
-    if not matches:
+    if not summary:
         print(f"No matches found between {team1} and {team2}")
-        client.close()
-        return None
-    
-    # Calculate statistics
-    team1_wins = 0
-    team2_wins = 0
-    draws = 0
-    team1_goals = 0
-    team2_goals = 0
-    
-    match_details = []
-    
-    for match in matches:
-        home = match['home_team']['name']
-        away = match['away_team']['name']
-        home_goals = match.get('home_team_goal', 0)
-        away_goals = match.get('away_team_goal', 0)
-        
-        # Determine result from team1's perspective
-        if home == team1:
-            team1_goals += home_goals
-            team2_goals += away_goals
-            if home_goals > away_goals:
-                team1_wins += 1
-                result = f"{team1} win"
-            elif home_goals < away_goals:
-                team2_wins += 1
-                result = f"{team2} win"
-            else:
-                draws += 1
-                result = "Draw"
-        else:
-            team1_goals += away_goals
-            team2_goals += home_goals
-            if away_goals > home_goals:
-                team1_wins += 1
-                result = f"{team1} win"
-            elif away_goals < home_goals:
-                team2_wins += 1
-                result = f"{team2} win"
-            else:
-                draws += 1
-                result = "Draw"
-        
-        match_details.append({
-            'date': match['date'],
-            'season': match['season'],
-            'home': home,
-            'away': away,
-            'score': f"{home_goals}-{away_goals}",
-            'result': result,
-            'league': match.get('league_name', 'Unknown')
-        })
-    
-    summary = {
-        'team1': team1,
-        'team2': team2,
-        'total_matches': len(matches),
-        'team1_wins': team1_wins,
-        'team2_wins': team2_wins,
-        'draws': draws,
-        'team1_goals': team1_goals,
-        'team2_goals': team2_goals,
-        'matches': match_details
-    }
     
-    client.close()
     return summary
 
 
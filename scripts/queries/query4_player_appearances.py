@@ -3,7 +3,13 @@ Query 4: Player Appearance Frequency
 Shows most frequently appearing players by league/season
 """
 
-from pymongo import MongoClient
+import sys
+import os
+
+# Add project root to path to import the shared query engine
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from soccer_analytics.queries import player_appearances
 
 def get_player_appearances(league_name, season, limit=15):
     """Get players with most appearances"""
@@ -14,56 +20,9 @@ def get_player_appearances(league_name, season, limit=15):
     print(f"Season: {season}")
     print(f"{'='*70}\n")
     
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    matches = db.matches.find({
-        'league_name': league_name,
-        'season': season
-    })
-    
-    player_stats = {}
-    
-    print("Counting player appearances...\n")
-    
-    for match in matches:
-        # Process home lineup
-        for player in match.get('home_lineup', []):
-            name = player.get('player_name')
-            if name:
-                if name not in player_stats:
-                    player_stats[name] = {
-                        'player': name,
-                        'appearances': 0,
-                        'teams': set()
-                    }
-                player_stats[name]['appearances'] += 1
-                player_stats[name]['teams'].add(match['home_team']['name'])
-        
-        # Process away lineup
-        for player in match.get('away_lineup', []):
-            name = player.get('player_name')
-            if name:
-                if name not in player_stats:
-                    player_stats[name] = {
-                        'player': name,
-                        'appearances': 0,
-                        'teams': set()
-                    }
-                player_stats[name]['appearances'] += 1
-                player_stats[name]['teams'].add(match['away_team']['name'])
-    
-    # Convert teams set to string
-    for player in player_stats.values():
-        player['teams'] = ', '.join(sorted(player['teams']))
-    
-    # Sort by appearances
-    top_players = sorted(player_stats.values(), 
-                        key=lambda x: x['appearances'], 
-                        reverse=True)[:limit]
+    result = player_appearances(league_name, season, limit)
     
-    client.close()
-    return top_players
+    return result['players']
 
 
 def print_results(players):
@@ -3,7 +3,13 @@ Query 5: Team Form Analysis
 Shows recent performance trends (last N games)
 """
 
-from pymongo import MongoClient
+import sys
+import os
+
+# Add project root to path to import the shared query engine
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from soccer_analytics.queries import team_form, league_form
 from datetime import datetime
 
 def get_team_form(team_name, league_name, season, last_n=5):
@@ -17,132 +23,19 @@ def get_team_form(team_name, league_name, season, last_n=5):
     print(f"Last {last_n} matches")
     print(f"{'='*70}\n")
     
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    # Get all matches for this team
-    matches = list(db.matches.find({
-        'league_name': league_name,
-        'season': season,
-        '$or': [
-            {'home_team.name': team_name},
-            {'away_team.name': team_name}
-        ]
-    }).sort('date', 1))
+    summary = team_form(team_name, league_name, season, last_n)
     
-    if not matches:
+    if not summary:
         print(f"No matches found for {team_name}")
-        client.close()
-        return None
-    
-    # Get last N matches
-    recent_matches = matches[-last_n:] if len(matches) >= last_n else matches
-    
-    # Analyze form
-    form_string = ""
-    wins = 0
-    draws = 0
-    losses = 0
-    goals_for = 0
-    goals_against = 0
-    
-    match_details = []
-    
-    for match in recent_matches:
-        home = match['home_team']['name']
-        away = match['away_team']['name']
-        home_goals = match.get('home_team_goal', 0)
-        away_goals = match.get('away_team_goal', 0)
-        
-        # Determine result from team's perspective
-        if home == team_name:
-            goals_for += home_goals
-            goals_against += away_goals
-            if home_goals > away_goals:
-                form_string += "W"
-                wins += 1
-                result = "Win"
-            elif home_goals < away_goals:
-                form_string += "L"
-                losses += 1
-                result = "Loss"
-            else:
-                form_string += "D"
-                draws += 1
-                result = "Draw"
-            opponent = away
-            venue = "Home"
-        else:
-            goals_for += away_goals
-            goals_against += home_goals
-            if away_goals > home_goals:
-                form_string += "W"
-                wins += 1
-                result = "Win"
-            elif away_goals < home_goals:
-                form_string += "L"
-                losses += 1
-                result = "Loss"
-            else:
-                form_string += "D"
-                draws += 1
-                result = "Draw"
-            opponent = home
-            venue = "Away"
-        
-        match_details.append({
-            'date': match['date'],
-            'opponent': opponent,
-            'venue': venue,
-            'score': f"{home_goals}-{away_goals}",
-            'result': result
-        })
-    
-    points = wins * 3 + draws
-    max_points = len(recent_matches) * 3
-    
-    summary = {
-        'team': team_name,
-        'matches_analyzed': len(recent_matches),
-        'form': form_string,
-        'wins': wins,
-        'draws': draws,
-        'losses': losses,
-        'goals_for': goals_for,
-        'goals_against': goals_against,
-        'goal_diff': goals_for - goals_against,
-        'points': points,
-        'max_points': max_points,
-        'matches': match_details
-    }
-    
-    client.close()
+    
     return summary
 
 
 def get_all_teams_form(league_name, season, last_n=5):
     """Get form for all teams in league"""
     
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    # Get all unique teams
-    teams = db.matches.distinct('home_team.name', {
-        'league_name': league_name,
-        'season': season
-    })
-    
-    all_forms = []
-    
-    for team in teams:
-        form = get_team_form(team, league_name, season, last_n)
-        if form:
-            all_forms.append(form)
-    
-    # Sort by points in last N games
-    all_forms.sort(key=lambda x: (x['points'], x['goal_diff']), reverse=True)
-    
-    return all_forms
+    # Sorted by points in last N games
+    return league_form(league_name, season, last_n)
 
 
 def print_results(summary):
@@ -3,7 +3,13 @@ Query 6: High-Scoring and Low-Scoring Teams Analysis
 Offensive vs defensive team classification
 """
 
-from pymongo import MongoClient
+import sys
+import os
+
+# Add project root to path to import the shared query engine
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from soccer_analytics.queries import scoring_analysis
 
 def get_scoring_analysis(league_name, season):
     """Analyze offensive and defensive capabilities of teams"""
@@ -14,68 +20,9 @@ def get_scoring_analysis(league_name, season):
     print(f"Season: {season}")
     print(f"{'='*70}\n")
     
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    matches = db.matches.find({
-        'league_name': league_name,
-        'season': season
-    })
-    
-    teams = {}
-    
-    print("Analyzing offensive and defensive performance...\n")
+    result = scoring_analysis(league_name, season)
     
-    for match in matches:
-        home_team = match['home_team']['name']
-        away_team = match['away_team']['name']
-        home_goals = match.get('home_team_goal', 0)
-        away_goals = match.get('away_team_goal', 0)
-        
-        # Initialize teams
-        if home_team not in teams:
-            teams[home_team] = {
-                'team': home_team,
-                'matches': 0,
-                'goals_scored': 0,
-                'goals_conceded': 0
-            }
-        
-        if away_team not in teams:
-            teams[away_team] = {
-                'team': away_team,
-                'matches': 0,
-                'goals_scored': 0,
-                'goals_conceded': 0
-            }
-        
-        # Update stats
-        teams[home_team]['matches'] += 1
-        teams[home_team]['goals_scored'] += home_goals
-        teams[home_team]['goals_conceded'] += away_goals
-        
-        teams[away_team]['matches'] += 1
-        teams[away_team]['goals_scored'] += away_goals
-        teams[away_team]['goals_conceded'] += home_goals
-    
-    # Calculate averages
-    results = []
-    for team_data in teams.values():
-        avg_scored = team_data['goals_scored'] / team_data['matches']
-        avg_conceded = team_data['goals_conceded'] / team_data['matches']
-        
-        results.append({
-            'team': team_data['team'],
-            'matches': team_data['matches'],
-            'goals_scored': team_data['goals_scored'],
-            'goals_conceded': team_data['goals_conceded'],
-            'avg_scored': round(avg_scored, 2),
-            'avg_conceded': round(avg_conceded, 2),
-            'goal_diff': team_data['goals_scored'] - team_data['goals_conceded']
-        })
-    
-    client.close()
-    return results
+    return result['best_attack'] if result else []
 
 
 def print_results(results):
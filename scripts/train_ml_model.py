@@ -3,7 +3,6 @@ Train Machine Learning Model for Match Outcome Prediction
 Uses team attributes to predict Win/Draw/Loss
 """
 
-from pymongo import MongoClient
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -11,88 +10,27 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import pickle
+import sys
 import os
 
-def extract_features_from_mongodb():
+# Add project root to path to import the shared package
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from soccer_analytics.db import close_client, get_db
+from soccer_analytics import feature_store, model_artifact, prediction
+
+def extract_features_from_mongodb(db):
     """Extract match data with team attributes for ML training"""
     
-    print("Connecting to MongoDB...")
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    print("Loading team attributes...")
-    teams_attrs = {}
-    for team in db.teams.find():
-        if team.get('attributes_history'):
-            latest = team['attributes_history'][-1]
-            teams_attrs[team['team_api_id']] = {
-                'buildUpPlaySpeed': latest.get('buildUpPlaySpeed', 50),
-                'defencePressure': latest.get('defencePressure', 50),
-                'chanceCreationShooting': latest.get('chanceCreationShooting', 50),
-                'defenceAggression': latest.get('defenceAggression', 50)
-            }
-    
-    print("Loading matches...")
-    matches = list(db.matches.find())
-    
-    print(f"Processing {len(matches)} matches...")
-    
-    data = []
-    
-    for match in matches:
-        home_id = match.get('home_team_api_id')
-        away_id = match.get('away_team_api_id')
-        
-        if home_id not in teams_attrs or away_id not in teams_attrs:
-            continue
-        
-        home_attrs = teams_attrs[home_id]
-        away_attrs = teams_attrs[away_id]
-        
-        # Calculate ratings
-        home_rating = (home_attrs['buildUpPlaySpeed'] + 
-                      home_attrs['defencePressure'] + 
-                      home_attrs['chanceCreationShooting']) / 3
-        
-        away_rating = (away_attrs['buildUpPlaySpeed'] + 
-                      away_attrs['defencePressure'] + 
-                      away_attrs['chanceCreationShooting']) / 3
-        
-        # Features
-        features = {
-            'home_rating': home_rating,
-            'away_rating': away_rating,
-            'rating_diff': home_rating - away_rating,
-            'home_build_up': home_attrs['buildUpPlaySpeed'],
-            'away_build_up': away_attrs['buildUpPlaySpeed'],
-            'home_defense': home_attrs['defencePressure'],
-            'away_defense': away_attrs['defencePressure'],
-            'home_attack': home_attrs['chanceCreationShooting'],
-            'away_attack': away_attrs['chanceCreationShooting'],
-            'attack_diff': home_attrs['chanceCreationShooting'] - away_attrs['chanceCreationShooting'],
-            'defense_diff': home_attrs['defencePressure'] - away_attrs['defencePressure'],
-            'home_advantage': 1
-        }
-        
-        # Target (outcome)
-        home_goals = match.get('home_team_goal', 0)
-        away_goals = match.get('away_team_goal', 0)
-        
-        if home_goals > away_goals:
-            outcome = 2  # Home win
-        elif away_goals > home_goals:
-            outcome = 0  # Away win
-        else:
-            outcome = 1  # Draw
-        
-        features['outcome'] = outcome
-        data.append(features)
-    
-    df = pd.DataFrame(data)
+    print("Loading features (feature store)...")
+    df, build = feature_store.load_features(db, with_form=False, sort_by_date=False)
+    if build['source'] == 'store':
+        print("✓ Loaded from the feature store (data unchanged since the last build)")
+    else:
+        print(f"✓ {build['source'].capitalize()} build: {build['fetched']} matches read from MongoDB")
     
     print(f"Created dataset with {len(df)} matches")
     
-    client.close()
     return df
 
 
@@ -104,7 +42,9 @@ def train_model():
     print("="*70 + "\n")
     
     # Extract data
-    df = extract_features_from_mongodb()
+    print("Connecting to MongoDB...")
+    db = get_db()
+    df = extract_features_from_mongodb(db)
     
     # Separate features and target
     X = df.drop('outcome', axis=1)
@@ -186,9 +126,25 @@ def train_model():
         'features': list(X.columns)
     }
     
+    # Every team pair scored up front so /api/predict becomes an array lookup
+    print("Precomputing all-pairs prediction matrix...")
+    matrix = prediction.PredictionMatrix.build(db, model, scaler, list(X.columns))
+    close_client()
+    model_data['prediction_matrix'] = matrix.to_dict()
+    print(f"✓ {len(matrix.teams)}x{len(matrix.teams)} team pairs")
+    
     with open('../data/model/rf_model.pkl', 'wb') as f:
         pickle.dump(model_data, f)
     
+    # Memory-mappable copy the app loads without unpickling
+    try:
+        artifact = model_artifact.save('../data/model', model_data)
+        print(f"✓ Array artifact saved to: {artifact}")
+    except Exception as e:
+        # Never leave an older artifact in place of the pickle just written
+        print(f"✗ Array artifact skipped ({e}); the app will load the pickle")
+        model_artifact.discard('../data/model')
+    
     print("Model saved to: ../data/model/rf_model.pkl")
     
     print("\n" + "="*70)
@@ -2,127 +2,38 @@
 Improved ML Model with Multiple Algorithms and Class Balancing
 """
 
-from pymongo import MongoClient
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+import argparse
 import pickle
+import sys
 import os
 
-def extract_features_with_form():
+# Add project root to path to import the shared package
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from soccer_analytics.db import close_client, get_db
+from soccer_analytics import feature_store, model_artifact, model_search, prediction
+
+def extract_features_with_form(db):
     """Extract features including recent form"""
     
-    print("Connecting to MongoDB...")
-    client = MongoClient('mongodb://localhost:27017/')
-    db = client['soccer_analytics']
-    
-    print("Loading team attributes...")
-    teams_attrs = {}
-    for team in db.teams.find():
-        if team.get('attributes_history'):
-            latest = team['attributes_history'][-1]
-            teams_attrs[team['team_api_id']] = {
-                'buildUpPlaySpeed': latest.get('buildUpPlaySpeed', 50),
-                'defencePressure': latest.get('defencePressure', 50),
-                'chanceCreationShooting': latest.get('chanceCreationShooting', 50),
-                'defenceAggression': latest.get('defenceAggression', 50)
-            }
-    
-    print("Loading and sorting matches by date...")
-    matches = list(db.matches.find().sort('date', 1))
-    
-    # Track team form (last 5 games)
-    team_form = {}  # team_id -> list of recent results (1 for win, 0.5 for draw, 0 for loss)
-    
-    data = []
-    
-    print(f"Processing {len(matches)} matches with form calculation...")
-    
-    for match in matches:
-        home_id = match.get('home_team_api_id')
-        away_id = match.get('away_team_api_id')
-        
-        if home_id not in teams_attrs or away_id not in teams_attrs:
-            continue
-        
-        # Initialize form tracking
-        if home_id not in team_form:
-            team_form[home_id] = []
-        if away_id not in team_form:
-            team_form[away_id] = []
-        
-        # Get recent form (last 5 games)
-        home_form = sum(team_form[home_id][-5:]) / 5 if team_form[home_id] else 0.5
-        away_form = sum(team_form[away_id][-5:]) / 5 if team_form[away_id] else 0.5
-        
-        home_attrs = teams_attrs[home_id]
-        away_attrs = teams_attrs[away_id]
-        
-        # Calculate ratings
-        home_rating = (home_attrs['buildUpPlaySpeed'] + 
-                      home_attrs['defencePressure'] + 
-                      home_attrs['chanceCreationShooting']) / 3
-        
-        away_rating = (away_attrs['buildUpPlaySpeed'] + 
-                      away_attrs['defencePressure'] + 
-                      away_attrs['chanceCreationShooting']) / 3
-        
-        # Features (including form)
-        features = {
-            'home_rating': home_rating,
-            'away_rating': away_rating,
-            'rating_diff': home_rating - away_rating,
-            'home_build_up': home_attrs['buildUpPlaySpeed'],
-            'away_build_up': away_attrs['buildUpPlaySpeed'],
-            'home_defense': home_attrs['defencePressure'],
-            'away_defense': away_attrs['defencePressure'],
-            'home_attack': home_attrs['chanceCreationShooting'],
-            'away_attack': away_attrs['chanceCreationShooting'],
-            'attack_diff': home_attrs['chanceCreationShooting'] - away_attrs['chanceCreationShooting'],
-            'defense_diff': home_attrs['defencePressure'] - away_attrs['defencePressure'],
-            'home_advantage': 1,
-            'home_form': home_form,
-            'away_form': away_form,
-            'form_diff': home_form - away_form
-        }
-        
-        # Target
-        home_goals = match.get('home_team_goal', 0)
-        away_goals = match.get('away_team_goal', 0)
-        
-        if home_goals > away_goals:
-            outcome = 2  # Home win
-            home_result = 1.0
-            away_result = 0.0
-        elif away_goals > home_goals:
-            outcome = 0  # Away win
-            home_result = 0.0
-            away_result = 1.0
-        else:
-            outcome = 1  # Draw
-            home_result = 0.5
-            away_result = 0.5
-        
-        features['outcome'] = outcome
-        data.append(features)
-        
-        # Update form tracking
-        team_form[home_id].append(home_result)
-        team_form[away_id].append(away_result)
-    
-    df = pd.DataFrame(data)
+    print("Loading features (feature store)...")
+    df, build = feature_store.load_features(db, with_form=True, sort_by_date=True)
+    if build['source'] == 'store':
+        print("✓ Loaded from the feature store (data unchanged since the last build)")
+    else:
+        print(f"✓ {build['source'].capitalize()} build: {build['fetched']} matches read from MongoDB")
     
     print(f"Created dataset with {len(df)} matches (with form features)")
     
-    client.close()
     return df
 
 
-def train_multiple_models():
+def train_multiple_models(workers=None, cv=3, search='grid', n_iter=10):
     """Train and compare multiple models"""
     
     print("\n" + "="*70)
@@ -130,7 +41,9 @@ def train_multiple_models():
     print("="*70 + "\n")
     
     # Extract data with form
-    df = extract_features_with_form()
+    print("Connecting to MongoDB...")
+    db = get_db()
+    df = extract_features_with_form(db)
     
     X = df.drop('outcome', axis=1)
     y = df['outcome']
@@ -148,24 +61,24 @@ def train_multiple_models():
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    # Define models to test
-    models = {
-        'Logistic Regression': LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced'),
-        'Random Forest': RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, class_weight='balanced'),
-        'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, max_depth=5, random_state=42)
-    }
+    # Cross-validated search over every model's parameters, one task per fold
+    print(f"\nSearching models ({search} search, {cv}-fold CV, {workers or os.cpu_count()} processes)...")
+    search_result = model_search.compare(
+        X_train_scaled, y_train.to_numpy(), workers=workers, cv=cv, search=search, n_iter=n_iter
+    )
+    print(f"✓ {search_result['tasks']} fits in {search_result['wall_time']:.1f}s "
+          f"on {search_result['workers']} processes")
     
     results = {}
     
-    print("\nTraining and evaluating models...\n")
+    print("\nEvaluating the best parameters of each model...\n")
     print("="*70)
     
-    for name, model in models.items():
+    for name, (params, cv_accuracy, model) in search_result['best'].items():
         print(f"\n{name}:")
         print("-" * 70)
-        
-        # Train
-        model.fit(X_train_scaled, y_train)
+        print(f"Best parameters: {params}")
+        print(f"CV accuracy: {cv_accuracy:.4f} ({cv_accuracy*100:.2f}%)")
         
         # Predict
         y_pred = model.predict(X_test_scaled)
@@ -228,9 +141,25 @@ def train_multiple_models():
         'model_name': best_name
     }
     
+    # Every team pair scored up front so /api/predict becomes an array lookup
+    print("Precomputing all-pairs prediction matrix...")
+    matrix = prediction.PredictionMatrix.build(db, best_model, scaler, list(X.columns))
+    close_client()
+    model_data['prediction_matrix'] = matrix.to_dict()
+    print(f"✓ {len(matrix.teams)}x{len(matrix.teams)} team pairs")
+    
     with open('data/model/rf_model.pkl', 'wb') as f:
         pickle.dump(model_data, f)
     
+    # Memory-mappable copy the app loads without unpickling
+    try:
+        artifact = model_artifact.save('data/model', model_data)
+        print(f"✓ Array artifact saved to: {artifact}")
+    except Exception as e:
+        # Never leave an older artifact in place of the pickle just written
+        print(f"✗ Array artifact skipped ({e}); the app will load the pickle")
+        model_artifact.discard('data/model')
+    
     print(f"Model saved to: data/model/rf_model.pkl")
     
     print("\n" + "="*70)
@@ -241,9 +170,42 @@ def train_multiple_models():
     print("\nImprovements from base model:")
     print("  - Added recent form features (last 5 games)")
     print("  - Class balancing to handle draws better")
-    print("  - Tested multiple algorithms")
+    print("  - Cross-validated parameter search over multiple algorithms")
     print("\nThe improved model is ready for predictions!\n")
 
 
+def benchmark_search(core_counts, cv=3, search='grid', n_iter=10):
+    """Wall time and speedup of the model search for each process count"""
+    print("Connecting to MongoDB...")
+    db = get_db()
+    df = extract_features_with_form(db)
+    X = df.drop('outcome', axis=1)
+    y = df['outcome']
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train_scaled = StandardScaler().fit_transform(X_train)
+    
+    # Speedup relative to the first process count given
+    print(f"\n{'Processes':<10} {'Wall time':>10} {'Speedup':>8}")
+    baseline = None
+    for workers in core_counts:
+        result = model_search.compare(X_train_scaled, y_train.to_numpy(), workers=workers,
+                                      cv=cv, search=search, n_iter=n_iter)
+        baseline = baseline or result['wall_time']
+        print(f"{workers:<10} {result['wall_time']:>9.1f}s {baseline / result['wall_time']:>7.2f}x")
+
+
 if __name__ == "__main__":
-    train_multiple_models()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, help='processes for the model search (default: all cores)')
+    parser.add_argument('--cv', type=int, default=3, help='cross-validation folds (default 3)')
+    parser.add_argument('--search', default='grid', choices=['grid', 'random'],
+                        help='try every parameter combination, or --n-iter random ones per model')
+    parser.add_argument('--n-iter', type=int, default=10, help='random search draws per model (default 10)')
+    parser.add_argument('--benchmark', type=int, nargs='+', metavar='PROCESSES',
+                        help='only time the search at these process counts (e.g. 1 2 4 8)')
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        benchmark_search(args.benchmark, cv=args.cv, search=args.search, n_iter=args.n_iter)
+    else:
+        train_multiple_models(workers=args.workers, cv=args.cv, search=args.search, n_iter=args.n_iter)
\ No newline at end of file
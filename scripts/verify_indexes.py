@@ -0,0 +1,46 @@
+"""
+Verify Query Plans
+Runs explain() on every registered query shape and exits non-zero if any
+of them falls back to a collection scan or an in-memory sort.
+"""
+
+import argparse
+import sys
+import os
+
+# Add project root to path to import the shared package
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from soccer_analytics import indexes
+from soccer_analytics.db import get_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--create', action='store_true',
+                        help='create the indexes in the index plan before verifying')
+    args = parser.parse_args()
+
+    db = get_db()
+
+    if args.create:
+        indexes.create_indexes(db)
+        print("✓ Index plan applied")
+
+    report = indexes.verify_query_plans(db)
+
+    print(f"\n{'Shape':<36} {'Plan':<50} {'OK':<4}")
+    print("-" * 92)
+    for name, stages, ok in report:
+        print(f"{name:<36} {' > '.join(reversed(stages)):<50} {'✓' if ok else '✗':<4}")
+
+    failed = [name for name, _, ok in report if not ok]
+    if failed:
+        print(f"\n✗ {len(failed)} query shape(s) use COLLSCAN or an in-memory SORT: {', '.join(failed)}")
+        sys.exit(1)
+
+    print(f"\n✓ All {len(report)} query shapes are index-backed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Soccer Analytics shared package
+Code used by both the Flask app and the command-line scripts
+"""
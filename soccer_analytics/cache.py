@@ -0,0 +1,113 @@
+"""
+In-process response cache
+Size-bounded LRU with a per-entry TTL. If a version source is given (e.g. the
+importer's data version) the cache checks it at most every
+version_check_interval seconds and empties itself when the version moves.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_key(*parts):
+    """Stable cache key: JSON with sorted keys so field order does not matter"""
+    return json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache with hit/miss counters"""
+
+    def __init__(self, max_entries=256, ttl=3600, version_source=None, version_check_interval=5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_source = version_source
+        self.version_check_interval = version_check_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, now):
+        """
+        Drop everything if the data version moved since the last check
+        The version source is a database call, so it runs outside the lock;
+        if it raises, the error propagates and the next lookup checks again.
+        """
+        if self.version_source is None:
+            return
+        with self._lock:
+            if now - self._version_checked_at < self.version_check_interval:
+                return
+            self._version_checked_at = now
+        try:
+            version = self.version_source()
+        except Exception:
+            with self._lock:
+                self._version_checked_at = 0.0
+            raise
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._entries.clear()
+                self.invalidations += 1
+            self._version = version
+
+    def get(self, key):
+        """Return the cached value or None; raises if the data version cannot be read"""
+        now = time.monotonic()
+        self._check_version(now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    @property
+    def version(self):
+        """Data version the current entries belong to (read it before computing a value)"""
+        with self._lock:
+            return self._version
+
+    def set(self, key, value, version=None):
+        """
+        Store a value, evicting the least recently used entry when full
+        With a version source, version is cache.version as read before the
+        value was computed; if the data version moved since, the value may
+        predate the change and is not stored.
+        """
+        with self._lock:
+            if self.version_source is not None and version != self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'data_version': self._version
+            }
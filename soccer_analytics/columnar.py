@@ -0,0 +1,258 @@
+"""
+Columnar match store
+League, season, date, teams and goals of every match held as NumPy arrays,
+with leagues, seasons and teams integer-coded against sorted vocabularies.
+MatchStore keeps one snapshot and reloads it when the data version moves;
+with a shared directory the snapshot is published once and memory-mapped by
+every worker process (see shared_store.py).
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+
+from soccer_analytics import data_version, shared_store
+from soccer_analytics.db import get_db
+from soccer_analytics.projections import COLUMNAR_FIELDS
+from soccer_analytics.team_season_stats import TEAM_STAT_COUNTERS, empty_team_stats
+
+MISSING_ID = -1
+
+# Name of the published snapshot in the shared directory
+SNAPSHOT_NAME = 'match_columns'
+
+ARRAY_FIELDS = (
+    'league', 'season', 'home', 'away', 'home_id', 'away_id',
+    'home_goals', 'away_goals', 'date', 'date_rank'
+)
+
+
+def _vocabulary(values):
+    """Sorted distinct values and the int32 code of every input value"""
+    names = sorted(set(values), key=lambda value: (value is None, value or ''))
+    index = {name: code for code, name in enumerate(names)}
+    return names, np.array([index[value] for value in values], dtype=np.int32)
+
+
+def _date_key(value):
+    """Sort key matching MongoDB's order for the date field: null < string < date"""
+    if value is None:
+        return (0, '')
+    if isinstance(value, datetime):
+        return (2, value)
+    return (1, str(value))
+
+
+class MatchColumns:
+    """Immutable snapshot of the match columns"""
+
+    def __init__(self, arrays, leagues, seasons, teams, string_dates=None, version=None):
+        for field in ARRAY_FIELDS:
+            setattr(self, field, arrays[field])
+        self.size = len(self.league)
+        self.version = version
+
+        self.leagues = leagues
+        self.seasons = seasons
+        self.teams = teams
+        # Dates the importer could not parse stay strings (index -> text)
+        self.string_dates = string_dates or {}
+
+        self._league_codes = {name: code for code, name in enumerate(self.leagues)}
+        self._season_codes = {name: code for code, name in enumerate(self.seasons)}
+        self._team_codes = {name: code for code, name in enumerate(self.teams)}
+
+    @classmethod
+    def from_matches(cls, matches, version=None):
+        """Build the columns from projected match documents"""
+        size = len(matches)
+        leagues, league = _vocabulary([m.get('league_name') for m in matches])
+        seasons, season = _vocabulary([m.get('season') for m in matches])
+        teams, codes = _vocabulary(
+            [m['home_team']['name'] for m in matches] + [m['away_team']['name'] for m in matches]
+        )
+
+        dates = [m.get('date') for m in matches]
+        order = sorted(range(size), key=lambda i: _date_key(dates[i]))
+        date_rank = np.empty(size, dtype=np.int64)
+        date_rank[order] = np.arange(size)
+
+        arrays = {
+            'league': league,
+            'season': season,
+            'home': codes[:size],
+            'away': codes[size:],
+            'home_id': np.array([m.get('home_team_api_id') or MISSING_ID for m in matches], dtype=np.int64),
+            'away_id': np.array([m.get('away_team_api_id') or MISSING_ID for m in matches], dtype=np.int64),
+            # Missing scores count as 0, as in match_goals()
+            'home_goals': np.array([m.get('home_team_goal') or 0 for m in matches], dtype=np.int32),
+            'away_goals': np.array([m.get('away_team_goal') or 0 for m in matches], dtype=np.int32),
+            'date': np.array(
+                [d if isinstance(d, datetime) else None for d in dates], dtype='datetime64[ms]'
+            ),
+            'date_rank': date_rank
+        }
+        string_dates = {
+            i: d for i, d in enumerate(dates) if d is not None and not isinstance(d, datetime)
+        }
+        return cls(arrays, leagues, seasons, teams, string_dates, version)
+
+    @classmethod
+    def load(cls, db):
+        """Read the projected matches in insertion order"""
+        version = data_version.current(db)
+        return cls.from_matches(list(db.matches.find({}, COLUMNAR_FIELDS).sort('_id', 1)), version)
+
+    @property
+    def arrays(self):
+        return {field: getattr(self, field) for field in ARRAY_FIELDS}
+
+    @property
+    def metadata(self):
+        """Everything except the arrays, JSON-serializable"""
+        return {
+            'leagues': self.leagues,
+            'seasons': self.seasons,
+            'teams': self.teams,
+            'string_dates': {str(i): d for i, d in self.string_dates.items()},
+            'version': self.version
+        }
+
+    @classmethod
+    def from_shared(cls, arrays, metadata):
+        """Wrap memory-mapped arrays attached from the shared directory"""
+        string_dates = {int(i): d for i, d in metadata['string_dates'].items()}
+        return cls(arrays, metadata['leagues'], metadata['seasons'], metadata['teams'],
+                   string_dates, metadata['version'])
+
+    def select(self, league_name, season, team_name=None):
+        """Indices of a league season's matches, optionally only one team's"""
+        league = self._league_codes.get(league_name)
+        season_code = self._season_codes.get(season)
+        if league is None or season_code is None:
+            return np.empty(0, dtype=np.int64)
+
+        mask = (self.league == league) & (self.season == season_code)
+        if team_name is not None:
+            team = self._team_codes.get(team_name)
+            if team is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= (self.home == team) | (self.away == team)
+        return np.flatnonzero(mask)
+
+    def sort_by_date(self, indices):
+        """Indices reordered by date (ties keep insertion order)"""
+        return indices[np.argsort(self.date_rank[indices], kind='stable')]
+
+    def team_season_stats(self, league_name, season):
+        """Per-team home/away counters, sorted by team (same rows as team_season_stats)"""
+        indices = self.select(league_name, season)
+        if not len(indices):
+            return []
+
+        n = len(self.teams)
+        home, away = self.home[indices], self.away[indices]
+        home_goals, away_goals = self.home_goals[indices], self.away_goals[indices]
+
+        counters = {}
+        for venue, team, goals_for, goals_against in (
+            ('home', home, home_goals, away_goals),
+            ('away', away, away_goals, home_goals)
+        ):
+            counters[f'{venue}_played'] = np.bincount(team, minlength=n)
+            counters[f'{venue}_wins'] = np.bincount(team[goals_for > goals_against], minlength=n)
+            counters[f'{venue}_draws'] = np.bincount(team[goals_for == goals_against], minlength=n)
+            counters[f'{venue}_losses'] = np.bincount(team[goals_for < goals_against], minlength=n)
+            counters[f'{venue}_goals_for'] = np.bincount(team, weights=goals_for, minlength=n)
+            counters[f'{venue}_goals_against'] = np.bincount(team, weights=goals_against, minlength=n)
+
+        # Team codes follow the sorted vocabulary, so rows come out sorted by name
+        present = np.flatnonzero(counters['home_played'] + counters['away_played'])
+        columns = {counter: counters[counter][present].astype(np.int64).tolist()
+                   for counter in TEAM_STAT_COUNTERS}
+
+        rows = []
+        for position, code in enumerate(present.tolist()):
+            row = empty_team_stats(self.teams[code])
+            for counter in TEAM_STAT_COUNTERS:
+                row[counter] = columns[counter][position]
+            rows.append(row)
+        return rows
+
+    def documents(self, indices):
+        """Match documents shaped like a projected find() for the given indices"""
+        teams = self.teams
+        return [
+            {
+                'date': self.string_dates.get(i, date),
+                'home_team': {'name': teams[home]},
+                'away_team': {'name': teams[away]},
+                'home_team_api_id': home_id if home_id != MISSING_ID else None,
+                'away_team_api_id': away_id if away_id != MISSING_ID else None,
+                'home_team_goal': home_goals,
+                'away_team_goal': away_goals
+            }
+            for i, date, home, away, home_id, away_id, home_goals, away_goals in zip(
+                indices.tolist(),
+                self.date[indices].tolist(),
+                self.home[indices].tolist(),
+                self.away[indices].tolist(),
+                self.home_id[indices].tolist(),
+                self.away_id[indices].tolist(),
+                self.home_goals[indices].tolist(),
+                self.away_goals[indices].tolist()
+            )
+        ]
+
+
+class MatchStore:
+    """
+    Current MatchColumns snapshot, reloaded when the data version moves
+    If shared_dir is set (SOCCER_SHARED_DIR by default) the first process to
+    need a version publishes it there and every process memory-maps it.
+    """
+
+    def __init__(self, db=None, version_check_interval=5, shared_dir=None):
+        self._db = db
+        self.shared_dir = shared_dir or os.environ.get('SOCCER_SHARED_DIR')
+        self._columns = data_version.VersionedValue(
+            self._load, lambda: data_version.current(self.db), version_check_interval
+        )
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_db()
+
+    @property
+    def refreshes(self):
+        return self._columns.loads
+
+    def refresh(self):
+        """Reload the snapshot now"""
+        return self._columns.refresh()
+
+    def get(self):
+        """Current snapshot, reloaded first if the data version moved"""
+        return self._columns.get()
+
+    def _load(self):
+        db = self.db
+        if not self.shared_dir:
+            return MatchColumns.load(db)
+
+        version = data_version.current(db)
+        try:
+            shared = shared_store.attach(self.shared_dir, SNAPSHOT_NAME, version)
+            if shared is None:
+                columns = MatchColumns.load(db)
+                shared_store.publish(self.shared_dir, SNAPSHOT_NAME, columns.version,
+                                     columns.arrays, columns.metadata)
+                shared = shared_store.attach(self.shared_dir, SNAPSHOT_NAME, columns.version)
+                if shared is None:
+                    # A newer version was published meanwhile; it is picked up on the next check
+                    return columns
+            return MatchColumns.from_shared(*shared)
+        except OSError:
+            # Snapshot replaced while attaching: fall back to a private copy
+            return MatchColumns.load(db)
@@ -0,0 +1,103 @@
+"""
+Data version marker
+Whenever the stored data changes (full import, incremental update, result
+correction) the writer bumps a version counter in the meta collection.
+Long-running readers such as the Flask app compare it against the version
+they cached under and drop stale state when it moves; VersionedValue does
+that for one loaded value.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+COLLECTION = 'meta'
+DOCUMENT_ID = 'data_version'
+
+
+def bump(db, reason=None):
+    """Advance the data version and return the new value"""
+    doc = db[COLLECTION].find_one_and_update(
+        {'_id': DOCUMENT_ID},
+        {
+            '$inc': {'version': 1},
+            '$set': {'updated_at': datetime.utcnow(), 'reason': reason}
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc['version']
+
+
+def current(db):
+    """Current data version (0 if the importer never recorded one)"""
+    doc = db[COLLECTION].find_one({'_id': DOCUMENT_ID}, {'version': 1})
+    return doc['version'] if doc else 0
+
+
+class VersionedValue:
+    """
+    A value loaded from MongoDB and reloaded when the data version moves
+    The version is polled at most every version_check_interval seconds.
+    Polls and reloads run outside the read lock, so get() keeps returning the
+    current value while a new one is being built; only the first load (when
+    there is nothing to serve yet) makes callers wait.
+    """
+
+    def __init__(self, load, version_source, version_check_interval=5, value=None, version=None):
+        self.load = load
+        self.version_source = version_source
+        self.version_check_interval = version_check_interval
+
+        self._value = value
+        self._version = version
+        self._version_checked_at = time.monotonic() if value is not None else 0.0
+        self._lock = threading.Lock()
+        # Serializes reloads so concurrent pollers do not build the value twice
+        self._reload_lock = threading.Lock()
+        self.loads = 0
+
+    def _reload(self, version=None):
+        """Load the value for `version` (read first if not given); caller holds _reload_lock"""
+        if version is None:
+            version = self.version_source()
+        value = self.load()
+        with self._lock:
+            self._value, self._version = value, version
+            self._version_checked_at = time.monotonic()
+            self.loads += 1
+        return value
+
+    def refresh(self):
+        """Reload the value now, regardless of the data version"""
+        with self._reload_lock:
+            return self._reload()
+
+    def get(self):
+        """Current value, reloaded first if the data version moved"""
+        now = time.monotonic()
+        with self._lock:
+            value, version = self._value, self._version
+            due = now - self._version_checked_at >= self.version_check_interval
+            if value is not None and due:
+                self._version_checked_at = now
+
+        if value is None:
+            with self._reload_lock:
+                # Another caller may have finished the first load while we waited
+                return self._value if self._value is not None else self._reload()
+        if not due:
+            return value
+
+        try:
+            current = self.version_source()
+        except Exception:
+            with self._lock:
+                self._version_checked_at = 0.0
+            raise
+        if current == version:
+            return value
+        with self._reload_lock:
+            return self._value if self._version == current else self._reload(current)
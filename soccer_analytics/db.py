@@ -0,0 +1,33 @@
+"""
+Shared MongoDB connection
+One pooled MongoClient per process instead of one client per query call
+"""
+
+import os
+from pymongo import MongoClient
+
+MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/')
+DB_NAME = os.environ.get('MONGO_DB', 'soccer_analytics')
+
+_client = None
+
+
+def get_client():
+    """Return the process-wide MongoClient, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = MongoClient(MONGO_URI)
+    return _client
+
+
+def get_db():
+    """Return the soccer_analytics database handle"""
+    return get_client()[DB_NAME]
+
+
+def close_client():
+    """Close the shared client (the next get_client() call reconnects)"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,161 @@
+"""
+Feature store
+The training feature matrix and the match columns it was built from,
+persisted as .npy arrays (see shared_store.py) under the data version and a
+hash of the feature definition. A store at the current version is loaded
+straight from disk; after an import only new or changed matches are read
+from MongoDB and the features are recomputed over the stored columns.
+Matches are streamed through a projected cursor straight into preallocated
+NumPy columns rather than collected as a list of documents.
+"""
+
+import hashlib
+import inspect
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from soccer_analytics import data_version, features, shared_store, team_attributes
+from soccer_analytics.columnar import MISSING_ID
+from soccer_analytics.projections import HASH_FIELD, MATCH_FIELDS
+
+DEFAULT_DIR = os.path.join('data', 'features')
+
+# HASH_FIELD holds a sha1 hex digest
+HASH_DTYPE = '<U40'
+
+# Documents per cursor round trip while streaming matches
+BATCH_SIZE = 10000
+
+STORE_FIELDS = dict(MATCH_FIELDS, match_api_id=1, **{HASH_FIELD: 1})
+MATCH_COLUMNS = (
+    'match_api_id', HASH_FIELD, 'date', 'home_team_api_id', 'away_team_api_id',
+    'home_team_goal', 'away_team_goal'
+)
+
+# dtype and fill value per column; a missing field keeps the fill (no team: MISSING_ID, no score: 0)
+COLUMN_DEFAULTS = {
+    'match_api_id': (np.int64, 0),
+    HASH_FIELD: (HASH_DTYPE, ''),
+    'date': ('datetime64[ns]', np.datetime64('NaT')),
+    'home_team_api_id': (np.int64, MISSING_ID),
+    'away_team_api_id': (np.int64, MISSING_ID),
+    'home_team_goal': (np.int64, 0),
+    'away_team_goal': (np.int64, 0)
+}
+
+FEATURE_PREFIX = 'features.'
+
+
+def definition_hash(with_form, sort_by_date):
+    """Changes whenever the feature code or the build options change"""
+    source = inspect.getsource(features) + inspect.getsource(team_attributes)
+    return hashlib.sha1(f'{with_form} {sort_by_date}\n{source}'.encode('utf-8')).hexdigest()[:12]
+
+
+def _empty_columns(size, names):
+    return {name: np.full(size, COLUMN_DEFAULTS[name][1], dtype=COLUMN_DEFAULTS[name][0]) for name in names}
+
+
+def stream_columns(cursor, size_hint, names=MATCH_COLUMNS):
+    """
+    Match columns filled document by document from a projected cursor
+    The arrays are preallocated for size_hint rows (doubled if more arrive)
+    and trimmed to the documents read, so the documents are never held as a
+    list. Missing fields keep their COLUMN_DEFAULTS value; unparsed (string)
+    dates stay NaT.
+    """
+    columns = _empty_columns(max(size_hint, 1), names)
+    count = 0
+    for doc in cursor:
+        if count == len(columns['match_api_id']):
+            grown = _empty_columns(2 * count, names)
+            for name, array in columns.items():
+                grown[name][:count] = array
+            columns = grown
+        for name, array in columns.items():
+            value = doc.get(name)
+            if name == 'date':
+                if isinstance(value, datetime):
+                    array[count] = value
+            elif value:
+                array[count] = value
+        count += 1
+    # Copy when trimming so the unused capacity is freed
+    return {name: array if count == len(array) else array[:count].copy() for name, array in columns.items()}
+
+
+def read_match_columns(db, stored=None):
+    """
+    Match columns in insertion order, reusing stored rows whose content hash is unchanged
+    Returns (columns, fetched): only the `fetched` new or changed matches are
+    read in full from MongoDB.
+    """
+    total = db.matches.estimated_document_count()
+    if stored is None or not len(stored['match_api_id']):
+        cursor = db.matches.find({}, STORE_FIELDS, batch_size=BATCH_SIZE).sort('_id', 1)
+        columns = stream_columns(cursor, total)
+        return columns, len(columns['match_api_id'])
+
+    cursor = db.matches.find({}, {'_id': 0, 'match_api_id': 1, HASH_FIELD: 1}, batch_size=BATCH_SIZE).sort('_id', 1)
+    listing = stream_columns(cursor, total, ('match_api_id', HASH_FIELD))
+    ids, hashes = listing['match_api_id'], listing[HASH_FIELD]
+
+    position = pd.Index(stored['match_api_id']).get_indexer(ids)
+    reused = position >= 0
+    reused[reused] = stored[HASH_FIELD][position[reused]] == hashes[reused]
+    reused &= hashes != ''
+
+    changed = ids[~reused]
+    cursor = db.matches.find({'match_api_id': {'$in': changed.tolist()}}, STORE_FIELDS, batch_size=BATCH_SIZE)
+    fresh = stream_columns(cursor, len(changed))
+    order = pd.Index(fresh['match_api_id']).get_indexer(changed)
+
+    columns = {}
+    for column in MATCH_COLUMNS:
+        values = np.empty(len(ids), dtype=np.result_type(stored[column].dtype, fresh[column].dtype))
+        values[reused] = stored[column][position[reused]]
+        values[~reused] = fresh[column][order]
+        columns[column] = values
+    return columns, len(changed)
+
+
+def build(columns, timelines, with_form=True, sort_by_date=True):
+    """Feature matrix for match columns, as features.build_features computes it"""
+    matches = pd.DataFrame({column: columns[column] for column in MATCH_FIELDS if column != '_id'})
+    if sort_by_date:
+        # Same order as sort('date', 1): missing dates first, ties in insertion order
+        matches = matches.sort_values('date', kind='stable', na_position='first', ignore_index=True)
+    return features.build_features(matches, timelines, with_form=with_form)
+
+
+def load_features(db, with_form=True, sort_by_date=True, store_dir=None):
+    """
+    Training feature matrix, from the store when it matches the data version
+    Returns (DataFrame, report) where report['source'] is 'store',
+    'incremental' or 'full' and report['fetched'] counts the matches read.
+    """
+    store_dir = store_dir or os.environ.get('SOCCER_FEATURE_DIR', DEFAULT_DIR)
+    name = f'features-{definition_hash(with_form, sort_by_date)}'
+    version = data_version.current(db)
+
+    stored = None
+    published = shared_store.published_version(store_dir, name)
+    if published is not None:
+        stored = shared_store.attach(store_dir, name, published)
+    if stored is not None:
+        arrays, metadata = stored
+        if metadata['version'] == version:
+            df = pd.DataFrame({column: arrays[FEATURE_PREFIX + column] for column in metadata['columns']})
+            return df, {'source': 'store', 'fetched': 0, 'matches': len(df)}
+        stored = arrays
+
+    columns, fetched = read_match_columns(db, stored)
+    df = build(columns, features.load_team_attributes(db), with_form, sort_by_date)
+
+    arrays = dict(columns, **{FEATURE_PREFIX + column: df[column].to_numpy() for column in df.columns})
+    shared_store.publish(store_dir, name, version, arrays, {'version': version, 'columns': list(df.columns)})
+    source = 'full' if stored is None else 'incremental'
+    return df, {'source': source, 'fetched': fetched, 'matches': len(df)}
@@ -0,0 +1,108 @@
+"""
+Match outcome features
+Vectorized feature builders for the training scripts. Team attributes are
+joined onto whole match columns as of each match date (see team_attributes.py)
+and rolling form is computed per team over a date-sorted long-format table,
+instead of walking matches in Python.
+"""
+
+import numpy as np
+import pandas as pd
+
+from soccer_analytics.team_attributes import AttributeTimelines
+
+# Results averaged into the form features
+FORM_WINDOW = 5
+NO_FORM = 0.5
+
+# Column order the trained model (and /api/predict) expects
+BASE_FEATURES = [
+    'home_rating', 'away_rating', 'rating_diff',
+    'home_build_up', 'away_build_up',
+    'home_defense', 'away_defense',
+    'home_attack', 'away_attack',
+    'attack_diff', 'defense_diff',
+    'home_advantage'
+]
+FORM_FEATURES = ['home_form', 'away_form', 'form_diff']
+
+def load_team_attributes(db):
+    """Dated attribute timelines of every team"""
+    return AttributeTimelines.load(db)
+
+
+def match_outcomes(home_goals, away_goals):
+    """2 = home win, 1 = draw, 0 = away win"""
+    return np.where(home_goals > away_goals, 2, np.where(home_goals < away_goals, 0, 1))
+
+
+def rolling_form(home_ids, away_ids, outcomes, window=FORM_WINDOW):
+    """
+    Points-per-game form of both teams going into each match
+    Matches must be in date order. Each team's form is the sum of its last
+    `window` results (win 1, draw 0.5, loss 0) divided by `window`, or
+    NO_FORM before its first match. Returns (home_form, away_form).
+    """
+    n = len(outcomes)
+    home_result = np.select([outcomes == 2, outcomes == 1], [1.0, 0.5], 0.0)
+
+    # Long format: one row per team per match, in match order
+    long = pd.DataFrame({
+        'team': np.concatenate([home_ids, away_ids]),
+        'match': np.concatenate([np.arange(n), np.arange(n)]),
+        'result': np.concatenate([home_result, 1.0 - home_result])
+    }).sort_values(['team', 'match'], kind='stable')
+
+    # Running totals per team: sum of the last `window` results before a match
+    # is the total one match back minus the total window + 1 matches back
+    by_team = long.groupby('team', sort=False)
+    played_before = by_team.cumcount().to_numpy()
+    totals = long.assign(total=by_team['result'].cumsum()).groupby('team', sort=False)['total']
+    recent = (totals.shift(1, fill_value=0.0) - totals.shift(window + 1, fill_value=0.0)).to_numpy()
+    form = np.where(played_before > 0, recent / window, NO_FORM)
+
+    per_row = np.empty(2 * n)
+    per_row[long.index.to_numpy()] = form
+    return per_row[:n], per_row[n:]
+
+
+def build_features(matches, timelines, with_form=True):
+    """
+    Feature matrix plus 'outcome' for every match whose teams both have attributes
+    Each team's attributes are the snapshot current on the match date.
+    Matches must already be in date order when with_form is set.
+    """
+    known = timelines.known(matches['home_team_api_id']) & timelines.known(matches['away_team_api_id'])
+    matches = matches[known]
+
+    # Positional rows so home and away attributes line up match by match
+    home = timelines.as_of(matches['home_team_api_id'].to_numpy(), matches['date'].to_numpy(dtype=object))
+    away = timelines.as_of(matches['away_team_api_id'].to_numpy(), matches['date'].to_numpy(dtype=object))
+    home_rating = (home['buildUpPlaySpeed'] + home['defencePressure'] + home['chanceCreationShooting']) / 3
+    away_rating = (away['buildUpPlaySpeed'] + away['defencePressure'] + away['chanceCreationShooting']) / 3
+
+    columns = {
+        'home_rating': home_rating.to_numpy(),
+        'away_rating': away_rating.to_numpy(),
+        'rating_diff': (home_rating - away_rating).to_numpy(),
+        'home_build_up': home['buildUpPlaySpeed'].to_numpy(),
+        'away_build_up': away['buildUpPlaySpeed'].to_numpy(),
+        'home_defense': home['defencePressure'].to_numpy(),
+        'away_defense': away['defencePressure'].to_numpy(),
+        'home_attack': home['chanceCreationShooting'].to_numpy(),
+        'away_attack': away['chanceCreationShooting'].to_numpy(),
+        'attack_diff': (home['chanceCreationShooting'] - away['chanceCreationShooting']).to_numpy(),
+        'defense_diff': (home['defencePressure'] - away['defencePressure']).to_numpy(),
+        'home_advantage': np.ones(len(matches), dtype=np.int64)
+    }
+
+    outcomes = match_outcomes(matches['home_team_goal'].to_numpy(), matches['away_team_goal'].to_numpy())
+    if with_form:
+        home_form, away_form = rolling_form(
+            matches['home_team_api_id'].to_numpy(), matches['away_team_api_id'].to_numpy(), outcomes
+        )
+        columns.update(home_form=home_form, away_form=away_form, form_diff=home_form - away_form)
+
+    columns['outcome'] = outcomes
+    order = BASE_FEATURES + (FORM_FEATURES if with_form else []) + ['outcome']
+    return pd.DataFrame(columns, columns=order)
@@ -0,0 +1,147 @@
+"""
+Index plan and query-plan verification
+INDEX_PLAN lists the indexes every read shape relies on. verify_query_plans()
+runs explain() on each registered shape and reports any plan that falls back
+to a collection scan or a blocking in-memory sort.
+"""
+
+from soccer_analytics import match_events, odds, team_season_stats
+from soccer_analytics.projections import (
+    FORM_FIELDS,
+    HEAD_TO_HEAD_FIELDS,
+    LINEUP_FIELDS,
+    OUTCOME_FIELDS,
+    RESULT_FIELDS,
+    STANDINGS_FIELDS,
+    TEAM_ATTRIBUTE_HISTORY_FIELDS,
+)
+
+# (collection, keys, options)
+INDEX_PLAN = [
+    # Every league/season endpoint; date keeps form queries sorted
+    ('matches', [('league_name', 1), ('season', 1), ('date', 1)], {}),
+    # Covers the standings read (filter + projection) without fetching documents
+    ('matches', [('league_name', 1), ('season', 1),
+                 ('home_team.name', 1), ('away_team.name', 1),
+                 ('home_team_goal', 1), ('away_team_goal', 1)], {}),
+    # Head-to-head: each $or branch is an equality on both names, sorted by date
+    ('matches', [('home_team.name', 1), ('away_team.name', 1), ('date', 1)], {}),
+    ('matches', [('match_api_id', 1)], {'unique': True}),
+    ('matches', [('date', 1)], {}),
+    ('matches', [('league_id', 1)], {}),
+    ('matches', [('season', 1)], {}),
+    ('matches', [('home_team_api_id', 1)], {}),
+    ('matches', [('away_team_api_id', 1)], {}),
+    ('players', [('player_api_id', 1)], {'unique': True}),
+    ('players', [('player_name', 1)], {}),
+    ('teams', [('team_api_id', 1)], {'unique': True}),
+    ('teams', [('team_long_name', 1)], {}),
+    ('leagues', [('name', 1)], {}),
+    (team_season_stats.COLLECTION, [('league_name', 1), ('season', 1), ('team', 1)], {'unique': True}),
+    # Events: timeline of one match, per-player / per-team tallies, goal timing per season
+    (match_events.COLLECTION, [('match_api_id', 1), ('minute', 1)], {}),
+    (match_events.COLLECTION, [('player_api_id', 1), ('event', 1)], {}),
+    (match_events.COLLECTION, [('team_api_id', 1), ('event', 1)], {}),
+    (match_events.COLLECTION, [('league_name', 1), ('season', 1), ('event', 1), ('minute', 1)], {}),
+    (odds.COLLECTION, [('match_api_id', 1)], {'unique': True}),
+]
+
+
+def create_indexes(db):
+    """Create every index in INDEX_PLAN (existing indexes are left as they are)"""
+    created = []
+    for collection, keys, options in INDEX_PLAN:
+        created.append(db[collection].create_index(keys, **options))
+    return created
+
+
+def _sample_values(db):
+    """Real league, season, teams and match id to plug into the query shapes"""
+    match = db.matches.find_one(
+        {'home_team.name': {'$ne': None}},
+        {'_id': 0, 'league_name': 1, 'season': 1, 'match_api_id': 1,
+         'home_team.name': 1, 'away_team.name': 1}
+    )
+    if match is None:
+        return None
+    return {
+        'league': match['league_name'],
+        'season': match['season'],
+        'team1': match['home_team']['name'],
+        'team2': match['away_team']['name'],
+        'match_api_id': match['match_api_id']
+    }
+
+
+def query_shapes(values):
+    """name -> (collection, filter, sort, projection) for every indexed read"""
+    league_season = {'league_name': values['league'], 'season': values['season']}
+    head_to_head = {
+        '$or': [
+            {'home_team.name': values['team1'], 'away_team.name': values['team2']},
+            {'home_team.name': values['team2'], 'away_team.name': values['team1']}
+        ]
+    }
+    team_in_season = dict(league_season, **{
+        '$or': [{'home_team.name': values['team1']}, {'away_team.name': values['team1']}]
+    })
+
+    return {
+        'standings (queries 1, 2, 6)': ('matches', league_season, None, STANDINGS_FIELDS),
+        'player appearances (query 4)': ('matches', league_season, None, LINEUP_FIELDS),
+        'attributes correlation (query 7)': ('matches', league_season, None, OUTCOME_FIELDS),
+        'head to head (query 3)': ('matches', head_to_head, [('date', 1)], HEAD_TO_HEAD_FIELDS),
+        'head to head in league (query 3)': (
+            'matches', dict(head_to_head, league_name=values['league']), [('date', 1)], HEAD_TO_HEAD_FIELDS
+        ),
+        'team form (query 5)': ('matches', team_in_season, [('date', 1)], FORM_FIELDS),
+        'league form (query 5)': ('matches', league_season, [('date', 1)], FORM_FIELDS),
+        'result correction': ('matches', {'match_api_id': values['match_api_id']}, None, RESULT_FIELDS),
+        'team lookup (predict)': (
+            'teams', {'team_long_name': {'$in': [values['team1'], values['team2']]}}, None,
+            TEAM_ATTRIBUTE_HISTORY_FIELDS
+        ),
+        'team season stats': (team_season_stats.COLLECTION, league_season, [('team', 1)], None),
+        'match timeline': (
+            match_events.COLLECTION, {'match_api_id': values['match_api_id']}, [('minute', 1)], None
+        ),
+        'goal timing': (
+            match_events.COLLECTION, dict(league_season, event='goal'), [('minute', 1)], None
+        ),
+    }
+
+
+def _plan_stages(plan):
+    """All stage names in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def verify_query_plans(db):
+    """
+    Explain every registered query shape
+    Returns a list of (shape, stages, ok) tuples; a shape is not ok when
+    its winning plan contains COLLSCAN or a blocking SORT stage.
+    """
+    values = _sample_values(db)
+    if values is None:
+        raise ValueError("matches collection is empty - import data before verifying indexes")
+
+    report = []
+    for name, (collection, query, sort, projection) in query_shapes(values).items():
+        cursor = db[collection].find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()['queryPlanner']['winningPlan']
+        stages = _plan_stages(plan)
+        ok = 'COLLSCAN' not in stages and 'SORT' not in stages
+        report.append((name, stages, ok))
+    return report
@@ -0,0 +1,96 @@
+"""
+Match events
+The Match table stores goals, shots, fouls, cards, crosses, corners and
+possession as XML strings. The importer parses them once into small
+match_events documents (one per <value>) instead of copying the raw XML
+into every match document.
+"""
+
+import xml.etree.ElementTree as ET
+from io import BytesIO
+
+COLLECTION = 'match_events'
+
+# Match columns holding event XML; also the 'event' field of each document
+EVENT_COLUMNS = ('goal', 'shoton', 'shotoff', 'foulcommit', 'card', 'cross', 'corner', 'possession')
+
+# XML tag -> document field, for the integer-valued tags
+INT_FIELDS = {
+    'id': 'event_id',
+    'elapsed': 'minute',
+    'elapsed_plus': 'minute_plus',
+    'team': 'team_api_id',
+    'player1': 'player_api_id',
+    'player2': 'player2_api_id',
+    'homepos': 'home_possession',
+    'awaypos': 'away_possession'
+}
+
+# XML tag -> document field, kept as text
+TEXT_FIELDS = {
+    'type': 'type',
+    'subtype': 'subtype',
+    'goal_type': 'goal_type',
+    'card_type': 'card_type'
+}
+
+
+def _to_int(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_values(xml_text):
+    """
+    Stream the top-level <value> elements of one event column
+    Yields {tag: text} for the leaf children of each value; malformed XML
+    yields nothing rather than failing the import.
+    """
+    depth = 0
+    try:
+        for action, elem in ET.iterparse(BytesIO(xml_text.encode('utf-8')), events=('start', 'end')):
+            if action == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1 and elem.tag == 'value':
+                yield {child.tag: child.text for child in elem if len(child) == 0}
+                elem.clear()
+    except ET.ParseError:
+        return
+
+
+def parse_event(event, value):
+    """Compact document for one <value> (None fields dropped)"""
+    doc = {'event': event}
+    for tag, field in INT_FIELDS.items():
+        number = _to_int(value.get(tag))
+        if number is not None:
+            doc[field] = number
+    for tag, field in TEXT_FIELDS.items():
+        if value.get(tag):
+            doc[field] = value[tag]
+    return doc
+
+
+def extract_events(match_doc):
+    """
+    Pop the XML columns off a match document and return its events
+    Each event carries match_api_id, league_name and season so per-season
+    scorer and timing queries never touch the matches collection.
+    """
+    context = {
+        'match_api_id': match_doc.get('match_api_id'),
+        'league_name': match_doc.get('league_name'),
+        'season': match_doc.get('season')
+    }
+    events = []
+    for column in EVENT_COLUMNS:
+        xml_text = match_doc.pop(column, None)
+        if not xml_text:
+            continue
+        for value in iter_values(xml_text):
+            events.append(dict(context, **parse_event(column, value)))
+    return events
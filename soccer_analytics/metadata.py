@@ -0,0 +1,59 @@
+"""
+Dropdown metadata registry
+Leagues, seasons and team names are loaded once and served from memory.
+The registry re-reads them only when the data version in the meta collection
+moves (checked at most every version_check_interval seconds).
+"""
+
+from soccer_analytics import data_version
+
+
+def load_metadata(db):
+    """Read the sorted league, season and team lists from MongoDB"""
+    return {
+        'leagues': sorted(db.leagues.distinct('name')),
+        'seasons': sorted(db.matches.distinct('season'), reverse=True),
+        'teams': sorted(db.teams.distinct('team_long_name'))
+    }
+
+
+class MetadataRegistry:
+    """In-memory leagues/seasons/teams, refreshed on data version change"""
+
+    def __init__(self, db, version_check_interval=5):
+        self.db = db
+        self._metadata = data_version.VersionedValue(
+            lambda: load_metadata(db), lambda: data_version.current(db), version_check_interval
+        )
+
+    @property
+    def refreshes(self):
+        return self._metadata.loads
+
+    @property
+    def version_check_interval(self):
+        return self._metadata.version_check_interval
+
+    @version_check_interval.setter
+    def version_check_interval(self, seconds):
+        self._metadata.version_check_interval = seconds
+
+    def refresh(self):
+        """Reload everything now, regardless of the data version"""
+        return self._metadata.refresh()
+
+    def get(self):
+        """Current metadata dict, reloaded first if the data version moved"""
+        return self._metadata.get()
+
+    @property
+    def leagues(self):
+        return self.get()['leagues']
+
+    @property
+    def seasons(self):
+        return self.get()['seasons']
+
+    @property
+    def teams(self):
+        return self.get()['teams']
@@ -0,0 +1,94 @@
+"""
+Micro-batching inference
+Concurrent /api/predict requests each score a 1xN feature row. MicroBatcher
+queues those rows, and a worker thread scores everything that arrives within
+a short window (or until max_rows are waiting) with one model call, then
+hands each request thread its own rows back. The window is cut short once
+every caller currently waiting is in the batch, so a lone request is scored
+straight away; under load, requests that arrive while a batch is being
+scored form the next one. A request waits at most the window plus one
+batch's scoring time.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Scores concurrently submitted rows together; score(X) -> one result row per input row"""
+
+    def __init__(self, score, window=0.002, max_rows=64):
+        self.score = score
+        self.window = window
+        self.max_rows = max_rows
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        # Callers whose rows are queued or being scored
+        self._waiting = 0
+
+        self.batches = 0
+        self.rows = 0
+
+    def predict(self, X):
+        """score(X), computed in a batch with whatever other rows are waiting"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.window <= 0 or self.max_rows <= 1:
+            return self.score(X)
+        self._start()
+        future = Future()
+        with self._lock:
+            self._waiting += 1
+        self._queue.put((X, future))
+        return future.result()
+
+    def _start(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name='micro-batch', daemon=True)
+                    self._worker.start()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes or max_rows"""
+        pending = [self._queue.get()]
+        rows = len(pending[0][0])
+        deadline = time.monotonic() + self.window
+        while rows < self.max_rows and len(pending) < self._waiting:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            rows += len(pending[-1][0])
+        return pending
+
+    def _done(self, pending):
+        with self._lock:
+            self._waiting -= len(pending)
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            try:
+                result = self.score(np.concatenate([X for X, _ in pending]))
+            except Exception as e:
+                self._done(pending)
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            self._done(pending)
+            self.batches += 1
+            self.rows += len(result)
+            offset = 0
+            for X, future in pending:
+                future.set_result(result[offset:offset + len(X)])
+                offset += len(X)
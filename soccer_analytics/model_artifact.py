@@ -0,0 +1,394 @@
+"""
+Model artifact
+The trained model saved as plain arrays instead of a pickle: every tree's
+node table (children, split feature, threshold, leaf values) concatenated
+into .npy files plus a JSON header, published with shared_store. Loading
+memory-maps the arrays, so there is nothing to unpickle and every worker
+process shares the same pages. Covers the models the training scripts pick
+from (random forest, multiclass gradient boosting, logistic regression) and
+the StandardScaler in front of them; predictions match sklearn's exactly.
+Tree ensembles are evaluated all trees at once over the flat node arrays,
+with the scaler folded into the split thresholds, which keeps single-row
+latency far below sklearn's per-tree predict_proba calls.
+"""
+
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+import sklearn
+from scipy.special import logsumexp
+
+from soccer_analytics import shared_store
+from soccer_analytics.team_attributes import ATTRIBUTE_FIELDS
+
+SNAPSHOT_NAME = 'model'
+MATRIX_PREFIX = 'prediction_matrix.'
+
+# Bumped whenever the array layout changes; older artifacts are ignored
+FORMAT = 3
+
+# Rows traversed together; bounds the (rows, trees) node matrix
+TRAVERSAL_CHUNK = 4096
+
+
+def _sklearn_version():
+    """(major, minor) of the installed scikit-learn"""
+    return tuple(int(re.match(r'\d+', part).group()) for part in sklearn.__version__.split('.')[:2])
+
+
+def _softmax(raw):
+    """Row-wise softmax computed the way sklearn.utils.extmath.softmax does"""
+    raw = raw - raw.max(axis=1).reshape(-1, 1)
+    np.exp(raw, out=raw)
+    raw /= raw.sum(axis=1).reshape(-1, 1)
+    return raw
+
+
+def _logsumexp_proba(raw):
+    """Multinomial deviance probabilities as gradient boosting computed them before 1.4"""
+    return np.nan_to_num(np.exp(raw - logsumexp(raw, axis=1)[:, np.newaxis]))
+
+
+# Raw prediction -> probability functions, by the header's 'link'
+LINKS = {'softmax': _softmax, 'logsumexp': _logsumexp_proba}
+
+
+def _node_tables(trees):
+    """
+    Concatenate sklearn tree_ objects: (arrays, roots, max_depth), child ids made global
+    Leaves point to themselves, so walking every tree max_depth steps lands
+    each one on its leaf without tracking which trees are finished.
+    """
+    lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        nodes = np.arange(tree.node_count) + offset
+        leaf = tree.children_left == -1
+        lefts.append(np.where(leaf, nodes, tree.children_left + offset))
+        rights.append(np.where(leaf, nodes, tree.children_right + offset))
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        values.append(tree.value[:, 0, :])
+        roots.append(offset)
+        offset += tree.node_count
+    arrays = {
+        'left': np.concatenate(lefts).astype(np.int64),
+        'right': np.concatenate(rights).astype(np.int64),
+        'feature': np.concatenate(features).astype(np.int64),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'value': np.concatenate(values).astype(np.float64)
+    }
+    return arrays, np.array(roots, dtype=np.int64), max(int(tree.max_depth) for tree in trees)
+
+
+def fold_thresholds(arrays, mean, scale):
+    """
+    Split thresholds on unscaled features, so prediction can skip the scaler
+    sklearn sends a row left when float32((x - mean) / scale) <= threshold.
+    That test is monotone in x, so for every node there is a largest float64
+    x that passes it; bisecting down to adjacent doubles finds it exactly,
+    and x <= raw_threshold then decides every input the same way.
+    """
+    feature, threshold = arrays['feature'], arrays['threshold']
+    split = np.isfinite(threshold)
+    mean, scale, threshold = mean[feature[split]], scale[feature[split]], threshold[split]
+
+    def passes(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    # Bracket [low passes, high fails] around the algebraic inverse
+    guess = threshold * scale + mean
+    step = np.abs(guess) * 1e-6 + 1e-6
+    low, high = guess - step, guess + step
+    for _ in range(2000):
+        low_fails, high_passes = ~passes(low), passes(high)
+        if not (low_fails.any() or high_passes.any()):
+            break
+        low = np.where(low_fails, low - step, low)
+        high = np.where(high_passes, high + step, high)
+        step = np.where(low_fails | high_passes, step * 2, step)
+
+    # Halve until low and high are neighbouring doubles
+    while True:
+        middle = low + (high - low) / 2
+        open_ = (middle != low) & (middle != high)
+        if not open_.any():
+            break
+        middle_passes = passes(middle)
+        low = np.where(open_ & middle_passes, middle, low)
+        high = np.where(open_ & ~middle_passes, middle, high)
+
+    raw = np.full(len(arrays['threshold']), np.inf)
+    raw[split] = low
+    return raw
+
+
+def export_model(model):
+    """(kind, arrays, header) for a fitted classifier; ValueError if unsupported"""
+    name = type(model).__name__
+    header = {'classes': np.asarray(model.classes_).tolist(), 'n_features': int(model.n_features_in_)}
+
+    if name == 'RandomForestClassifier':
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError('multi-output forests are not supported')
+        arrays, roots, header['max_depth'] = _node_tables([estimator.tree_ for estimator in model.estimators_])
+        if _sklearn_version() < (1, 4):
+            # tree_.value holds weighted class counts, which predict_proba normalizes
+            # per row; from 1.4 on it holds the fractions and is used as is
+            totals = arrays['value'].sum(axis=1, keepdims=True)
+            totals[totals == 0.0] = 1.0
+            arrays['value'] = arrays['value'] / totals
+        arrays['roots'] = roots
+        return 'forest', arrays, header
+
+    if name == 'GradientBoostingClassifier':
+        # One tree per class and stage (n_trees_per_iteration_ only exists from 1.4)
+        if model.estimators_.shape[1] < 3:
+            raise ValueError('only multiclass gradient boosting is supported')
+        if model.init_ != 'zero' and type(model.init_).__name__ != 'DummyClassifier':
+            raise ValueError('only the default (prior) init estimator is supported')
+        stages, per_stage = model.estimators_.shape
+        arrays, roots, header['max_depth'] = _node_tables(
+            [estimator.tree_ for estimator in model.estimators_.ravel()]
+        )
+        arrays['value'] = arrays['value'][:, 0].copy()
+        arrays['roots'] = roots.reshape(stages, per_stage)
+        # Prior-based raw prediction, identical for every row. It is computed
+        # differently across scikit-learn versions, so it is taken from the
+        # model's own (private) method rather than re-derived here
+        raw_predict_init = getattr(model, '_raw_predict_init', None)
+        if raw_predict_init is None:
+            raise ValueError(f'scikit-learn {sklearn.__version__} does not expose the boosting init prediction')
+        arrays['init_raw'] = raw_predict_init(np.zeros((1, model.n_features_in_)))[0]
+        header['learning_rate'] = float(model.learning_rate)
+        header['link'] = 'softmax' if _sklearn_version() >= (1, 4) else 'logsumexp'
+        return 'boosting', arrays, header
+
+    if name == 'LogisticRegression':
+        if len(model.classes_) < 3:
+            raise ValueError('only multiclass logistic regression is supported')
+        # sklearn multiplies by coef_.T, and its memory layout decides the matmul
+        # path (so the last bits). Recent releases leave coef_ Fortran-ordered,
+        # so coef_.T is saved as is; older lbfgs fits leave a row view of a wider
+        # buffer (the intercept column sliced off), which is saved padded to the
+        # same row width and sliced again at prediction time
+        coef = model.coef_
+        if coef.T.flags.c_contiguous:
+            arrays = {'coef_t': coef.T}
+        else:
+            width = coef.shape[1]
+            if coef.strides[1] == coef.itemsize and coef.strides[0] % coef.itemsize == 0:
+                width = max(width, coef.strides[0] // coef.itemsize)
+            rows = np.zeros((coef.shape[0], width))
+            rows[:, :coef.shape[1]] = coef
+            arrays = {'coef_rows': rows}
+        arrays['intercept'] = model.intercept_
+        return 'linear', arrays, header
+
+    raise ValueError(f'{name} cannot be exported as arrays')
+
+
+class ArrayScaler:
+    """StandardScaler.transform over stored mean/scale arrays"""
+
+    def __init__(self, mean, scale):
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def export(cls, scaler):
+        n = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n)
+        return {'scaler_mean': np.asarray(mean, dtype=np.float64), 'scaler_scale': np.asarray(scale, dtype=np.float64)}
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean
+        X /= self.scale
+        return X
+
+
+class ArrayModel:
+    """
+    predict_proba over an exported node table or linear model
+    Tree ensembles are walked all trees at once: a (rows, trees) matrix of
+    node ids advances one level per step, max_depth steps in total.
+    """
+
+    def __init__(self, kind, arrays, header):
+        self.kind = kind
+        self.arrays = arrays
+        self.classes_ = np.array(header['classes'])
+        self.n_features_in_ = header['n_features']
+        self.learning_rate = header.get('learning_rate')
+        self.max_depth = header.get('max_depth', 0)
+        self.link = LINKS[header.get('link', 'softmax')]
+        if kind == 'boosting':
+            # Same products sklearn forms while adding up the stages
+            self._terms = self.learning_rate * arrays['value']
+
+    @property
+    def scaler_folded(self):
+        """Whether predict_proba_unscaled is available (thresholds folded with the scaler)"""
+        return 'raw_threshold' in self.arrays
+
+    def _leaves(self, X, threshold):
+        """(rows, trees) leaf ids, trees in the order of the flattened roots"""
+        left, right, feature = self.arrays['left'], self.arrays['right'], self.arrays['feature']
+        roots = self.arrays['roots'].ravel()
+        node = np.tile(roots, (len(X), 1))
+        rows = np.arange(len(X)).reshape(-1, 1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, feature[node]] <= threshold[node]
+            node = np.where(go_left, left[node], right[node])
+        return node
+
+    def _tree_proba(self, X, threshold):
+        proba = np.empty((len(X), len(self.classes_)))
+        for start in range(0, len(X), TRAVERSAL_CHUNK):
+            chunk = slice(start, start + TRAVERSAL_CHUNK)
+            node = self._leaves(X[chunk], threshold)
+            # cumsum adds strictly left to right, the order sklearn accumulates trees in
+            if self.kind == 'forest':
+                proba[chunk] = np.cumsum(self.arrays['value'][node], axis=1)[:, -1] / node.shape[1]
+            else:
+                stages = self._terms[node].reshape(len(node), *self.arrays['roots'].shape)
+                init = np.broadcast_to(self.arrays['init_raw'], (len(node), 1, stages.shape[2]))
+                raw = np.cumsum(np.concatenate([init, stages], axis=1), axis=1)[:, -1]
+                proba[chunk] = self.link(raw)
+        return proba
+
+    def predict_proba(self, X):
+        """Probabilities for scaled input, as the sklearn estimator gives them"""
+        if self.kind == 'linear':
+            X = np.asarray(X, dtype=np.float64)
+            if 'coef_t' in self.arrays:
+                coef_t = self.arrays['coef_t']
+            else:
+                coef_t = self.arrays['coef_rows'][:, :self.n_features_in_].T
+            return _softmax(X @ coef_t + self.arrays['intercept'])
+        # sklearn trees split on float32 features
+        return self._tree_proba(np.asarray(X, dtype=np.float32), self.arrays['threshold'])
+
+    def predict_proba_unscaled(self, X):
+        """predict_proba(scaler.transform(X)) for tree models, without the transform"""
+        return self._tree_proba(np.asarray(X, dtype=np.float64), self.arrays['raw_threshold'])
+
+
+def export(model, scaler):
+    """(arrays, header) for a fitted model and its scaler; ValueError if unsupported"""
+    kind, arrays, header = export_model(model)
+    arrays.update(ArrayScaler.export(scaler))
+    if kind != 'linear':
+        arrays['raw_threshold'] = fold_thresholds(arrays, arrays['scaler_mean'], arrays['scaler_scale'])
+    header.update(format=FORMAT, kind=kind)
+    return arrays, header
+
+
+def save(root, model_data, version=None):
+    """
+    Publish model_data (model, scaler, features, model_name, prediction_matrix)
+    as an array artifact under root; raises ValueError for unsupported models.
+    Returns the artifact directory.
+    """
+    arrays, header = export(model_data['model'], model_data['scaler'])
+    header.update(
+        features=list(model_data['features']),
+        model_name=model_data.get('model_name')
+    )
+
+    matrix = model_data.get('prediction_matrix')
+    if matrix is not None:
+        arrays[MATRIX_PREFIX + 'probabilities'] = matrix['probabilities']
+        header['prediction_matrix'] = {
+            'teams': matrix['teams'],
+            'snapshots': [
+                {field: snapshot[field] for field in ATTRIBUTE_FIELDS if field in snapshot}
+                for snapshot in matrix['snapshots']
+            ],
+            'version': matrix['version']
+        }
+
+    version = version if version is not None else int(time.time() * 1000)
+    return shared_store.publish(root, SNAPSHOT_NAME, version, arrays, header)
+
+
+def discard(root):
+    """Remove the published artifact (e.g. when a newer model could not be exported)"""
+    version = shared_store.published_version(root, SNAPSHOT_NAME)
+    while version is not None:
+        shutil.rmtree(shared_store.snapshot_path(root, SNAPSHOT_NAME, version), ignore_errors=True)
+        version = shared_store.published_version(root, SNAPSHOT_NAME)
+
+
+def load(root, legacy_path=None):
+    """
+    Model bundle dict (model, scaler, features, model_name, prediction_matrix)
+    Memory-maps the array artifact under root; falls back to the pickle at
+    legacy_path when no artifact (in the current FORMAT) has been published.
+    """
+    version = shared_store.published_version(root, SNAPSHOT_NAME)
+    shared = shared_store.attach(root, SNAPSHOT_NAME, version) if version is not None else None
+    if shared is None or shared[1].get('format') != FORMAT:
+        if legacy_path is None or not os.path.exists(legacy_path):
+            raise FileNotFoundError(f'No model artifact in {root}')
+        with open(legacy_path, 'rb') as f:
+            model_data = pickle.load(f)
+        return {
+            'model': model_data['model'],
+            'scaler': model_data['scaler'],
+            'features': model_data['features'],
+            'model_name': model_data.get('model_name'),
+            'prediction_matrix': model_data.get('prediction_matrix')
+        }
+
+    arrays, header = shared
+    matrix = header.get('prediction_matrix')
+    if matrix is not None:
+        matrix = dict(matrix, probabilities=arrays[MATRIX_PREFIX + 'probabilities'])
+    return {
+        'model': ArrayModel(header['kind'], arrays, header),
+        'scaler': ArrayScaler(arrays['scaler_mean'], arrays['scaler_scale']),
+        'features': header['features'],
+        'model_name': header.get('model_name'),
+        'prediction_matrix': matrix
+    }
+
+
+class LazyModel:
+    """Loads a model on first use, or ahead of time from a warm-up thread"""
+
+    def __init__(self, load):
+        self._load = load
+        self._value = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def get(self):
+        """The loaded value; the first caller loads it, concurrent callers wait"""
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._load()
+        return self._value
+
+    def warm_up(self):
+        """Start loading in a background thread"""
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                print(f"Warning: Could not load the ML model: {e}")
+
+        thread = threading.Thread(target=run, name='model-warm-up', daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,129 @@
+"""
+Model search
+Cross-validated comparison of the candidate classifiers and their
+hyperparameters (grid or random search), fanned out over a process pool.
+The scaled training matrix is published once with shared_store and every
+worker memory-maps it read-only, so a (candidate, fold) task only carries
+its parameters. Each model's best parameters are then refitted on the full
+training set in the same pool.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+from soccer_analytics import shared_store
+
+SNAPSHOT_NAME = 'training'
+
+# Base estimator and search space per model; the bases are the former fixed settings
+CANDIDATES = {
+    'Logistic Regression': (
+        LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced'),
+        {'C': [0.01, 0.1, 1.0, 10.0]}
+    ),
+    'Random Forest': (
+        RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, class_weight='balanced'),
+        {'max_depth': [6, 8, 10, 12, None], 'min_samples_leaf': [1, 5, 20]}
+    ),
+    'Gradient Boosting': (
+        GradientBoostingClassifier(n_estimators=100, max_depth=5, random_state=42),
+        {'max_depth': [3, 5], 'learning_rate': [0.05, 0.1]}
+    )
+}
+
+# Worker process state: the attached training snapshot
+_data = None
+
+
+def candidates(search='grid', n_iter=10, random_state=42):
+    """(model name, params) pairs: the full grid, or up to n_iter random draws per model"""
+    pairs = []
+    for name, (_, space) in CANDIDATES.items():
+        grid = ParameterGrid(space)
+        if search == 'random':
+            draws = ParameterSampler(space, min(n_iter, len(grid)), random_state=random_state)
+            pairs += [(name, params) for params in draws]
+        elif search == 'grid':
+            pairs += [(name, params) for params in grid]
+        else:
+            raise ValueError(f'unknown search {search!r} (grid or random)')
+    return pairs
+
+
+def fold_ids(y, n_splits, random_state=42):
+    """Stratified CV fold number of every row"""
+    folds = np.empty(len(y), dtype=np.int64)
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for fold, (_, test) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        folds[test] = fold
+    return folds
+
+
+def _attach(root):
+    global _data
+    _data, _ = shared_store.attach(root, SNAPSHOT_NAME, 0)
+
+
+def _estimator(name, params):
+    return clone(CANDIDATES[name][0]).set_params(**params)
+
+
+def _evaluate(task):
+    """Validation accuracy of one candidate on one fold"""
+    name, params, fold = task
+    X, y, folds = _data['X'], _data['y'], _data['fold']
+    train = folds != fold
+    model = _estimator(name, params).fit(X[train], y[train])
+    return float((model.predict(X[~train]) == y[~train]).mean())
+
+
+def _refit(task):
+    name, params = task
+    return _estimator(name, params).fit(_data['X'], _data['y'])
+
+
+def compare(X, y, workers=None, cv=3, search='grid', n_iter=10, random_state=42):
+    """
+    Cross-validate every candidate, then refit each model's best parameters on all of X
+    Returns {'scores': [(name, params, mean, std)], 'best': {name: (params, mean, model)},
+    'tasks': fits run, 'workers': processes used, 'wall_time': seconds}.
+    """
+    workers = workers or os.cpu_count() or 1
+    pairs = candidates(search, n_iter, random_state)
+    tasks = [(name, params, fold) for name, params in pairs for fold in range(cv)]
+
+    root = tempfile.mkdtemp(prefix='model-search-')
+    try:
+        shared_store.publish(root, SNAPSHOT_NAME, 0, {
+            'X': np.asarray(X, dtype=np.float64),
+            'y': np.asarray(y),
+            'fold': fold_ids(y, cv, random_state)
+        }, {})
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(root,)) as pool:
+            accuracies = np.array(list(pool.map(_evaluate, tasks))).reshape(len(pairs), cv)
+
+            scores = [
+                (name, params, accuracy.mean(), accuracy.std())
+                for (name, params), accuracy in zip(pairs, accuracies)
+            ]
+            best = {}
+            for name, params, mean, _ in scores:
+                if name not in best or mean > best[name][1]:
+                    best[name] = (params, mean)
+            models = pool.map(_refit, [(name, params) for name, (params, _) in best.items()])
+            best = {name: (params, mean, model) for (name, (params, mean)), model in zip(best.items(), models)}
+        wall_time = time.perf_counter() - start
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {'scores': scores, 'best': best, 'tasks': len(tasks) + len(best), 'workers': workers, 'wall_time': wall_time}
@@ -0,0 +1,26 @@
+"""
+Bookmaker odds store
+The Match table has 30 odds columns (10 bookmakers x home/draw/away), mostly
+null and never read by the queries. The importer moves them into one dense
+match_odds document per match so match documents stay small.
+"""
+
+COLLECTION = 'match_odds'
+
+BOOKMAKERS = ('B365', 'BW', 'IW', 'LB', 'PS', 'WH', 'SJ', 'VC', 'GB', 'BS')
+OUTCOMES = ('H', 'D', 'A')
+ODDS_COLUMNS = tuple(bookmaker + outcome for bookmaker in BOOKMAKERS for outcome in OUTCOMES)
+
+
+def extract_odds(match_doc):
+    """
+    Pop the odds columns off a match document
+    Returns {'match_api_id': ..., 'B365': [home, draw, away], ...} with
+    only the bookmakers that priced the match, or None if none did.
+    """
+    doc = {'match_api_id': match_doc.get('match_api_id')}
+    for bookmaker in BOOKMAKERS:
+        prices = [match_doc.pop(bookmaker + outcome, None) for outcome in OUTCOMES]
+        if any(price is not None for price in prices):
+            doc[bookmaker] = [float(price) if price is not None else None for price in prices]
+    return doc if len(doc) > 1 else None
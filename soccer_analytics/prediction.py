@@ -0,0 +1,235 @@
+"""
+Match prediction
+Builds model input rows for /api/predict and /api/predict/batch from each
+team's attribute snapshot, the same columns the training scripts produce.
+A batch resolves all of its teams with one query and is scored with a single
+scaler.transform / predict_proba call. Undated predictions only depend on the
+two teams' latest attributes, so PredictionMatrix precomputes every pair.
+Single live predictions go through micro_batch.MicroBatcher in the app.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from soccer_analytics import data_version
+from soccer_analytics.features import NO_FORM
+from soccer_analytics.projections import TEAM_ATTRIBUTE_HISTORY_FIELDS
+from soccer_analytics.team_attributes import DEFAULT_ATTRIBUTE, snapshot_at
+
+# predict_proba column order
+OUTCOME_LABELS = ['Away Win', 'Draw', 'Home Win']
+
+
+def parse_match_date(value):
+    """Optional YYYY-MM-DD match date (None if not given); ValueError if malformed"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:10], '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError('date must be YYYY-MM-DD') from None
+
+
+def teams_by_name(teams):
+    """{team_long_name: document}; a duplicated name keeps its first document, as find_one did"""
+    by_name = {}
+    for team in teams:
+        if team.get('team_long_name'):
+            by_name.setdefault(team['team_long_name'], team)
+    return by_name
+
+
+def find_teams(db, names):
+    """Team documents (with attribute history) by team_long_name, one $in query"""
+    cursor = db.teams.find({'team_long_name': {'$in': sorted(set(names))}}, TEAM_ATTRIBUTE_HISTORY_FIELDS)
+    return teams_by_name(cursor)
+
+
+def team_snapshot(team, date=None):
+    """Attributes a team had on a date (latest when no date is given)"""
+    return snapshot_at(team.get('attributes_history'), date)
+
+
+def _attribute(snapshots, field):
+    return np.array([snapshot.get(field, DEFAULT_ATTRIBUTE) for snapshot in snapshots], dtype=np.float64)
+
+
+def team_ratings(snapshots):
+    """Overall rating per snapshot: mean of build-up speed, defence pressure and shooting"""
+    return (_attribute(snapshots, 'buildUpPlaySpeed') +
+            _attribute(snapshots, 'defencePressure') +
+            _attribute(snapshots, 'chanceCreationShooting')) / 3
+
+
+def feature_matrix(home_snapshots, away_snapshots, feature_names):
+    """Model input, one row per fixture, columns in feature_names order"""
+    n = len(home_snapshots)
+    home_rating = team_ratings(home_snapshots)
+    away_rating = team_ratings(away_snapshots)
+    home_attack = _attribute(home_snapshots, 'chanceCreationShooting')
+    away_attack = _attribute(away_snapshots, 'chanceCreationShooting')
+    home_defense = _attribute(home_snapshots, 'defencePressure')
+    away_defense = _attribute(away_snapshots, 'defencePressure')
+
+    columns = {
+        'home_rating': home_rating,
+        'away_rating': away_rating,
+        'rating_diff': home_rating - away_rating,
+        'home_build_up': _attribute(home_snapshots, 'buildUpPlaySpeed'),
+        'away_build_up': _attribute(away_snapshots, 'buildUpPlaySpeed'),
+        'home_defense': home_defense,
+        'away_defense': away_defense,
+        'home_attack': home_attack,
+        'away_attack': away_attack,
+        'attack_diff': home_attack - away_attack,
+        'defense_diff': home_defense - away_defense,
+        'home_advantage': np.ones(n),
+        # No match history at prediction time: neutral form
+        'home_form': np.full(n, NO_FORM),
+        'away_form': np.full(n, NO_FORM),
+        'form_diff': np.zeros(n)
+    }
+    return np.column_stack([columns[name] for name in feature_names])
+
+
+def score(model, scaler, X):
+    """(n, 3) away/draw/home probabilities for a feature_matrix, one predict_proba call"""
+    if getattr(model, 'scaler_folded', False):
+        # Array tree model: the scaler is folded into its split thresholds
+        return model.predict_proba_unscaled(X)
+    return model.predict_proba(scaler.transform(X))
+
+
+def predict_probabilities(model, scaler, feature_names, home_snapshots, away_snapshots):
+    """(n, 3) away/draw/home probabilities for n fixtures in one predict_proba call"""
+    return score(model, scaler, feature_matrix(home_snapshots, away_snapshots, feature_names))
+
+
+def describe(home_team, away_team, home_attrs, away_attrs, probabilities):
+    """/api/predict response body for one fixture"""
+    home_rating, away_rating = team_ratings([home_attrs, away_attrs]).tolist()
+    return {
+        'home_team': home_team,
+        'away_team': away_team,
+        'probabilities': {
+            'away_win': round(probabilities[0] * 100, 2),
+            'draw': round(probabilities[1] * 100, 2),
+            'home_win': round(probabilities[2] * 100, 2)
+        },
+        'prediction': OUTCOME_LABELS[probabilities.argmax()],
+        'confidence': round(probabilities.max() * 100, 2),
+        'team_attributes': {
+            'home': {
+                'rating': round(home_rating, 1),
+                'attack': home_attrs.get('chanceCreationShooting', DEFAULT_ATTRIBUTE),
+                'defense': home_attrs.get('defencePressure', DEFAULT_ATTRIBUTE)
+            },
+            'away': {
+                'rating': round(away_rating, 1),
+                'attack': away_attrs.get('chanceCreationShooting', DEFAULT_ATTRIBUTE),
+                'defense': away_attrs.get('defencePressure', DEFAULT_ATTRIBUTE)
+            }
+        }
+    }
+
+
+class PredictionMatrix:
+    """Away/draw/home probabilities of every (home, away) pair, from latest attributes"""
+
+    def __init__(self, teams, snapshots, probabilities, version):
+        self.teams = teams
+        self.snapshots = snapshots
+        self.probabilities = probabilities
+        self.version = version
+        self._index = {name: i for i, name in enumerate(teams)}
+
+    @classmethod
+    def build(cls, db, model, scaler, feature_names):
+        """Score all team pairs in one predict_proba call"""
+        version = data_version.current(db)
+        teams = teams_by_name(db.teams.find({}, TEAM_ATTRIBUTE_HISTORY_FIELDS))
+        names = sorted(teams)
+        snapshots = [team_snapshot(teams[name]) for name in names]
+
+        n = len(names)
+        home = [snapshot for snapshot in snapshots for _ in range(n)]
+        away = snapshots * n
+        probabilities = (
+            predict_probabilities(model, scaler, feature_names, home, away).reshape(n, n, -1)
+            if n else np.empty((0, 0, len(OUTCOME_LABELS)))
+        )
+        return cls(names, snapshots, probabilities, version)
+
+    def to_dict(self):
+        """Plain form stored in the model artifact under 'prediction_matrix'"""
+        return {
+            'teams': self.teams,
+            'snapshots': self.snapshots,
+            'probabilities': self.probabilities,
+            'version': self.version
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['teams'], data['snapshots'], data['probabilities'], data['version'])
+
+    def agrees_with(self, model, scaler, feature_names, sample=32):
+        """Whether live inference reproduces a spread of stored pairs (i.e. same model)"""
+        n = len(self.teams)
+        if not n:
+            return True
+        pairs = np.linspace(0, n * n - 1, min(sample, n * n)).astype(np.int64)
+        home, away = np.divmod(pairs, n)
+        live = predict_probabilities(
+            model, scaler, feature_names,
+            [self.snapshots[i] for i in home], [self.snapshots[i] for i in away]
+        )
+        return live.shape == self.probabilities[home, away].shape and \
+            np.allclose(live, self.probabilities[home, away], rtol=1e-9, atol=1e-12)
+
+    def lookup(self, home_team, away_team):
+        """(probabilities, home_attrs, away_attrs), or None if either team is not in the matrix"""
+        home = self._index.get(home_team)
+        away = self._index.get(away_team)
+        if home is None or away is None:
+            return None
+        return self.probabilities[home, away], self.snapshots[home], self.snapshots[away]
+
+
+class PredictionMatrixRegistry:
+    """
+    Current PredictionMatrix for one model, rebuilt when the data version moves
+    A matrix saved with the model artifact is used as long as live inference
+    reproduces it and it was built for the current data version. Rebuilds run
+    outside the lock; requests keep using the previous matrix meanwhile.
+    """
+
+    def __init__(self, db, model, scaler, feature_names, saved=None, version_check_interval=5):
+        self.db = db
+        self.model = model
+        self.scaler = scaler
+        self.feature_names = feature_names
+
+        matrix = PredictionMatrix.from_dict(saved) if saved is not None else None
+        if matrix is not None and not matrix.agrees_with(model, scaler, feature_names):
+            matrix = None
+        self._matrix = data_version.VersionedValue(
+            lambda: PredictionMatrix.build(db, model, scaler, feature_names),
+            lambda: data_version.current(db),
+            version_check_interval,
+            value=matrix,
+            version=matrix.version if matrix is not None else None
+        )
+
+    @property
+    def rebuilds(self):
+        return self._matrix.loads
+
+    def refresh(self):
+        """Rebuild the matrix now"""
+        return self._matrix.refresh()
+
+    def get(self):
+        """Current matrix, rebuilt first if the team attributes may have changed"""
+        return self._matrix.get()
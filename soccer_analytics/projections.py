@@ -0,0 +1,105 @@
+"""
+Field projections for every match and team read shape
+Match documents carry ~80 SQLite columns (player ids, lineup coordinates)
+plus both embedded lineups; each read asks only for the fields its query uses.
+"""
+
+# Queries 1, 2, 6 (in-memory backend): per-team tallies
+STANDINGS_FIELDS = {
+    '_id': 0,
+    'home_team.name': 1,
+    'away_team.name': 1,
+    'home_team_goal': 1,
+    'away_team_goal': 1
+}
+
+# Query 3: head-to-head match list
+HEAD_TO_HEAD_FIELDS = {
+    '_id': 0,
+    'date': 1,
+    'season': 1,
+    'league_name': 1,
+    'home_team.name': 1,
+    'away_team.name': 1,
+    'home_team_goal': 1,
+    'away_team_goal': 1
+}
+
+# Query 4: lineup appearances
+LINEUP_FIELDS = {
+    '_id': 0,
+    'home_team.name': 1,
+    'away_team.name': 1,
+    'home_lineup.player_name': 1,
+    'away_lineup.player_name': 1
+}
+
+# Query 5: recent form
+FORM_FIELDS = {
+    '_id': 0,
+    'date': 1,
+    'home_team.name': 1,
+    'away_team.name': 1,
+    'home_team_goal': 1,
+    'away_team_goal': 1
+}
+
+# Query 7: outcomes joined to team attributes by id and date
+OUTCOME_FIELDS = {
+    '_id': 0,
+    'date': 1,
+    'home_team_api_id': 1,
+    'away_team_api_id': 1,
+    'home_team_goal': 1,
+    'away_team_goal': 1
+}
+
+# Training features (feature store): match columns the features are built from
+MATCH_FIELDS = {
+    '_id': 0,
+    'date': 1,
+    'home_team_api_id': 1,
+    'away_team_api_id': 1,
+    'home_team_goal': 1,
+    'away_team_goal': 1
+}
+
+# Set by the importer on every document: digest compared by --incremental and the feature store
+HASH_FIELD = 'content_hash'
+
+# Columnar match store: every column the in-memory arrays hold
+COLUMNAR_FIELDS = {
+    '_id': 0,
+    'league_name': 1,
+    'season': 1,
+    'date': 1,
+    'home_team.name': 1,
+    'away_team.name': 1,
+    'home_team_api_id': 1,
+    'away_team_api_id': 1,
+    'home_team_goal': 1,
+    'away_team_goal': 1
+}
+
+# Result corrections: everything a team_season_stats delta needs
+RESULT_FIELDS = {
+    '_id': 0,
+    'league_name': 1,
+    'season': 1,
+    'home_team.name': 1,
+    'away_team.name': 1,
+    'home_team_goal': 1,
+    'away_team_goal': 1
+}
+
+# Query 7, training and /api/predict: dated tactical attribute snapshots
+TEAM_ATTRIBUTE_HISTORY_FIELDS = {
+    '_id': 0,
+    'team_api_id': 1,
+    'team_long_name': 1,
+    'attributes_history.date': 1,
+    'attributes_history.buildUpPlaySpeed': 1,
+    'attributes_history.defencePressure': 1,
+    'attributes_history.chanceCreationShooting': 1,
+    'attributes_history.defenceAggression': 1
+}
@@ -0,0 +1,41 @@
+"""
+Query engine shared by the Flask app and the command-line query scripts
+
+Every query takes an optional ``backend`` argument; by default the active
+backend from ``get_backend()`` is used (see backends.py).
+"""
+
+from soccer_analytics.queries.backends import (
+    BACKENDS,
+    ColumnarBackend,
+    InMemoryBackend,
+    MaterializedBackend,
+    PipelineBackend,
+    get_backend,
+    set_backend,
+)
+from soccer_analytics.queries.team_performance import team_performance
+from soccer_analytics.queries.home_away import home_away_performance
+from soccer_analytics.queries.head_to_head import head_to_head
+from soccer_analytics.queries.player_appearances import player_appearances
+from soccer_analytics.queries.team_form import team_form, league_form
+from soccer_analytics.queries.scoring_analysis import scoring_analysis
+from soccer_analytics.queries.attributes_correlation import attributes_correlation
+
+__all__ = [
+    'BACKENDS',
+    'ColumnarBackend',
+    'InMemoryBackend',
+    'MaterializedBackend',
+    'PipelineBackend',
+    'get_backend',
+    'set_backend',
+    'team_performance',
+    'home_away_performance',
+    'head_to_head',
+    'player_appearances',
+    'team_form',
+    'league_form',
+    'scoring_analysis',
+    'attributes_correlation',
+]
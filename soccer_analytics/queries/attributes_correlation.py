@@ -0,0 +1,79 @@
+"""
+Query 7: Team Attributes Correlation with Success
+Analyzes if team attributes (FIFA ratings) correlate with match outcomes,
+rating each team with the snapshot current on the match date
+"""
+
+from soccer_analytics.projections import OUTCOME_FIELDS
+from soccer_analytics.queries.backends import get_backend, match_goals
+
+
+def team_rating(attrs):
+    """Overall rating: mean of build-up speed, defence pressure and shooting"""
+    return (attrs['buildUpPlaySpeed'] +
+            attrs['defencePressure'] +
+            attrs['chanceCreationShooting']) / 3
+
+
+def attributes_correlation(league_name, season, backend=None):
+    """How often the higher-rated team wins, overall and per rating bucket"""
+    backend = backend or get_backend()
+
+    timelines = backend.team_attribute_timelines()
+    matches = backend.find_matches(
+        {'league_name': league_name, 'season': season},
+        fields=OUTCOME_FIELDS
+    )
+
+    totals = {'total_matches': 0, 'stronger_wins': 0, 'weaker_wins': 0, 'draws': 0}
+    rating_buckets = {}
+
+    # Both teams rated as they were on the match date
+    known = (timelines.known([match.get('home_team_api_id') for match in matches]) &
+             timelines.known([match.get('away_team_api_id') for match in matches]))
+    matches = [match for match, has_attributes in zip(matches, known) if has_attributes]
+    dates = [match.get('date') for match in matches]
+    home_attrs = timelines.as_of([match['home_team_api_id'] for match in matches], dates)
+    away_attrs = timelines.as_of([match['away_team_api_id'] for match in matches], dates)
+    rating_diffs = (team_rating(home_attrs) - team_rating(away_attrs)).tolist()
+
+    for match, rating_diff in zip(matches, rating_diffs):
+        home_goals, away_goals = match_goals(match)
+
+        if home_goals == away_goals:
+            key = 'draws'
+        elif (home_goals > away_goals and rating_diff > 0) or \
+             (away_goals > home_goals and rating_diff < 0):
+            key = 'stronger_wins'
+        else:
+            key = 'weaker_wins'
+
+        totals['total_matches'] += 1
+        totals[key] += 1
+
+        # Bucket by rating difference (5-point intervals)
+        bucket = int(rating_diff / 5) * 5
+        if bucket not in rating_buckets:
+            rating_buckets[bucket] = {'matches': 0, 'stronger_wins': 0, 'weaker_wins': 0, 'draws': 0}
+        rating_buckets[bucket]['matches'] += 1
+        rating_buckets[bucket][key] += 1
+
+    total = totals['total_matches']
+
+    buckets = []
+    for bucket_val, stats in sorted(rating_buckets.items()):
+        buckets.append({
+            'bucket_range': f"{bucket_val:+d} to {bucket_val+5:+d}",
+            'matches': stats['matches'],
+            'stronger_win_pct': round((stats['stronger_wins'] / stats['matches'] * 100), 1),
+            'upset_pct': round((stats['weaker_wins'] / stats['matches'] * 100), 1),
+            'draw_pct': round((stats['draws'] / stats['matches'] * 100), 1)
+        })
+
+    return dict(
+        totals,
+        stronger_win_pct=round((totals['stronger_wins'] / total * 100), 1) if total > 0 else 0,
+        weaker_win_pct=round((totals['weaker_wins'] / total * 100), 1) if total > 0 else 0,
+        draw_pct=round((totals['draws'] / total * 100), 1) if total > 0 else 0,
+        buckets=buckets
+    )
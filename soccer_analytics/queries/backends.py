@@ -0,0 +1,312 @@
+"""
+Query backends
+A backend supplies the raw per-team and per-match data that the query
+functions turn into results. Four implementations are provided:
+
+- MaterializedBackend: per-team counters read from the precomputed
+  team_season_stats collection (default)
+- PipelineBackend: aggregations run inside MongoDB, only result rows
+  come back over the wire
+- InMemoryBackend: projected match documents are fetched and tallied
+  in Python
+- ColumnarBackend: league-season reads answered from NumPy columns kept
+  in memory (see soccer_analytics/columnar.py)
+"""
+
+import os
+from abc import ABC, abstractmethod
+
+from soccer_analytics import team_season_stats
+from soccer_analytics.columnar import MatchStore
+from soccer_analytics.db import get_db
+from soccer_analytics.projections import LINEUP_FIELDS, STANDINGS_FIELDS
+from soccer_analytics.team_attributes import AttributeTimelines
+from soccer_analytics.team_season_stats import (
+    TEAM_STAT_COUNTERS,
+    empty_team_stats,
+    match_goals,
+    venue_group,
+)
+
+class MongoBackend(ABC):
+    """Reads shared by every backend: plain projected finds"""
+
+    name = None
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_db()
+
+    def find_matches(self, query, fields, sort=None):
+        """Return matching match documents restricted to the given fields"""
+        cursor = self.db.matches.find(query, fields)
+        if sort:
+            cursor = cursor.sort(sort)
+        return list(cursor)
+
+    def count_matches(self, league_name, season):
+        """Number of matches played in a league season"""
+        return self.db.matches.count_documents({
+            'league_name': league_name,
+            'season': season
+        })
+
+    def team_attribute_timelines(self):
+        """Dated tactical attributes of every team (AttributeTimelines)"""
+        return AttributeTimelines.load(self.db)
+
+    @abstractmethod
+    def team_season_stats(self, league_name, season):
+        """Per-team home/away counters for a league season, sorted by team"""
+
+    @abstractmethod
+    def player_appearances(self, league_name, season):
+        """Per-player appearance counts and teams for a league season"""
+
+
+class PipelineBackend(MongoBackend):
+    """Aggregations executed server side"""
+
+    name = 'pipeline'
+
+    def team_season_stats(self, league_name, season):
+        pipeline = [
+            {'$match': {'league_name': league_name, 'season': season}},
+            {'$project': {
+                '_id': 0,
+                'home': '$home_team.name',
+                'away': '$away_team.name',
+                'home_goals': {'$ifNull': ['$home_team_goal', 0]},
+                'away_goals': {'$ifNull': ['$away_team_goal', 0]}
+            }},
+            # Tally the home side and the away side of every match separately,
+            # then merge the two rows each team ends up with
+            {'$facet': {
+                'home': [venue_group('home', '$home', '$home_goals', '$away_goals')],
+                'away': [venue_group('away', '$away', '$away_goals', '$home_goals')]
+            }},
+            {'$project': {'rows': {'$concatArrays': ['$home', '$away']}}},
+            {'$unwind': '$rows'},
+            {'$replaceRoot': {'newRoot': '$rows'}},
+            {'$group': dict(
+                {'_id': '$_id'},
+                **{counter: {'$sum': f'${counter}'} for counter in TEAM_STAT_COUNTERS}
+            )},
+            {'$sort': {'_id': 1}}
+        ]
+
+        rows = []
+        for doc in self.db.matches.aggregate(pipeline):
+            row = empty_team_stats(doc.pop('_id'))
+            row.update(doc)
+            rows.append(row)
+        return rows
+
+    def player_appearances(self, league_name, season):
+        pipeline = [
+            {'$match': {'league_name': league_name, 'season': season}},
+            {'$project': {
+                '_id': 0,
+                'home_team': '$home_team.name',
+                'away_team': '$away_team.name',
+                'home_lineup': '$home_lineup.player_name',
+                'away_lineup': '$away_lineup.player_name'
+            }},
+            {'$facet': {
+                'home': [
+                    {'$unwind': '$home_lineup'},
+                    {'$project': {'player': '$home_lineup', 'team': '$home_team'}}
+                ],
+                'away': [
+                    {'$unwind': '$away_lineup'},
+                    {'$project': {'player': '$away_lineup', 'team': '$away_team'}}
+                ]
+            }},
+            {'$project': {'rows': {'$concatArrays': ['$home', '$away']}}},
+            {'$unwind': '$rows'},
+            {'$match': {'rows.player': {'$nin': [None, '']}}},
+            {'$group': {
+                '_id': '$rows.player',
+                'appearances': {'$sum': 1},
+                'teams': {'$addToSet': '$rows.team'}
+            }}
+        ]
+
+        return [
+            {
+                'player': doc['_id'],
+                'appearances': doc['appearances'],
+                'teams': sorted(doc['teams'])
+            }
+            for doc in self.db.matches.aggregate(pipeline)
+        ]
+
+
+class InMemoryBackend(MongoBackend):
+    """Projected match documents tallied in Python"""
+
+    name = 'memory'
+
+    def team_season_stats(self, league_name, season):
+        teams = {}
+        matches = self.find_matches(
+            {'league_name': league_name, 'season': season},
+            fields=STANDINGS_FIELDS
+        )
+
+        for match in matches:
+            home_team = match['home_team']['name']
+            away_team = match['away_team']['name']
+            home_goals, away_goals = match_goals(match)
+
+            for team, venue, goals_for, goals_against in (
+                (home_team, 'home', home_goals, away_goals),
+                (away_team, 'away', away_goals, home_goals)
+            ):
+                if team not in teams:
+                    teams[team] = empty_team_stats(team)
+                row = teams[team]
+                row[f'{venue}_played'] += 1
+                row[f'{venue}_goals_for'] += goals_for
+                row[f'{venue}_goals_against'] += goals_against
+                if goals_for > goals_against:
+                    row[f'{venue}_wins'] += 1
+                elif goals_for == goals_against:
+                    row[f'{venue}_draws'] += 1
+                else:
+                    row[f'{venue}_losses'] += 1
+
+        return [teams[team] for team in sorted(teams)]
+
+    def player_appearances(self, league_name, season):
+        player_stats = {}
+        matches = self.find_matches(
+            {'league_name': league_name, 'season': season},
+            fields=LINEUP_FIELDS
+        )
+
+        for match in matches:
+            for side in ('home', 'away'):
+                team = match[f'{side}_team']['name']
+                for player in match.get(f'{side}_lineup', []):
+                    name = player.get('player_name')
+                    if name:
+                        if name not in player_stats:
+                            player_stats[name] = {
+                                'player': name,
+                                'appearances': 0,
+                                'teams': set()
+                            }
+                        player_stats[name]['appearances'] += 1
+                        player_stats[name]['teams'].add(team)
+
+        for player in player_stats.values():
+            player['teams'] = sorted(player['teams'])
+        return list(player_stats.values())
+
+
+class MaterializedBackend(PipelineBackend):
+    """Per-team counters read from the team_season_stats collection"""
+
+    name = 'materialized'
+
+    def team_season_stats(self, league_name, season):
+        rows = team_season_stats.read(self.db, league_name, season)
+        if not rows:
+            # Collection not built yet (or unknown league season)
+            return super().team_season_stats(league_name, season)
+        return rows
+
+
+def _columnar_selection(query):
+    """(league, season, team) for the match queries the columns can answer, else None"""
+    if set(query) - {'league_name', 'season', '$or'}:
+        return None
+    league_name, season = query.get('league_name'), query.get('season')
+    if not isinstance(league_name, str) or not isinstance(season, str):
+        return None
+
+    team_name = None
+    if '$or' in query:
+        # Only "team played home or away": [{'home_team.name': t}, {'away_team.name': t}]
+        clauses = query['$or']
+        if len(clauses) != 2 or any(len(clause) != 1 for clause in clauses):
+            return None
+        fields = {field: value for clause in clauses for field, value in clause.items()}
+        if set(fields) != {'home_team.name', 'away_team.name'}:
+            return None
+        team_name = fields['home_team.name']
+        if not isinstance(team_name, str) or fields['away_team.name'] != team_name:
+            return None
+
+    return league_name, season, team_name
+
+
+class ColumnarBackend(PipelineBackend):
+    """League-season matches served from in-memory NumPy columns"""
+
+    name = 'columnar'
+
+    def __init__(self, db=None, store=None):
+        super().__init__(db)
+        self.store = store or MatchStore(db)
+        self._team_attributes = (None, None)
+
+    def find_matches(self, query, fields, sort=None):
+        selection = _columnar_selection(query)
+        if selection is None or sort not in (None, [('date', 1)]):
+            # Head-to-head and anything else the columns do not cover
+            return super().find_matches(query, fields, sort)
+
+        columns = self.store.get()
+        indices = columns.select(*selection)
+        if sort:
+            indices = columns.sort_by_date(indices)
+        return columns.documents(indices)
+
+    def count_matches(self, league_name, season):
+        return len(self.store.get().select(league_name, season))
+
+    def team_attribute_timelines(self):
+        # Cached alongside the column snapshot, refreshed with it
+        version = self.store.get().version
+        cached_version, timelines = self._team_attributes
+        if timelines is None or cached_version != version:
+            timelines = super().team_attribute_timelines()
+            self._team_attributes = (version, timelines)
+        return timelines
+
+    def team_season_stats(self, league_name, season):
+        return self.store.get().team_season_stats(league_name, season)
+
+
+BACKENDS = {
+    MaterializedBackend.name: MaterializedBackend,
+    PipelineBackend.name: PipelineBackend,
+    InMemoryBackend.name: InMemoryBackend,
+    ColumnarBackend.name: ColumnarBackend
+}
+
+_backend = None
+
+
+def get_backend():
+    """Return the active backend (SOCCER_QUERY_BACKEND env var, default materialized)"""
+    global _backend
+    if _backend is None:
+        _backend = BACKENDS[os.environ.get('SOCCER_QUERY_BACKEND', 'materialized')]()
+    return _backend
+
+
+def set_backend(backend):
+    """Switch the active backend by registered name or instance"""
+    global _backend
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown query backend: {backend} (choose from {', '.join(BACKENDS)})")
+        backend = BACKENDS[backend]()
+    _backend = backend
+    return _backend
@@ -0,0 +1,90 @@
+"""
+Query 3: Head-to-Head Historical Record
+Shows all matches and statistics between two specific teams
+"""
+
+from soccer_analytics.projections import HEAD_TO_HEAD_FIELDS
+from soccer_analytics.queries.backends import get_backend, match_goals
+
+
+def format_date(value):
+    """Render a match date as YYYY-MM-DD"""
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)[:10]
+
+
+def head_to_head(team1, team2, league_name=None, backend=None):
+    """Head-to-head record between two teams, or None if they never met"""
+    backend = backend or get_backend()
+
+    query = {
+        '$or': [
+            {'home_team.name': team1, 'away_team.name': team2},
+            {'home_team.name': team2, 'away_team.name': team1}
+        ]
+    }
+
+    if league_name:
+        query['league_name'] = league_name
+
+    matches = backend.find_matches(query, fields=HEAD_TO_HEAD_FIELDS, sort=[('date', 1)])
+
+    if not matches:
+        return None
+
+    team1_wins = 0
+    team2_wins = 0
+    draws = 0
+    team1_goals = 0
+    team2_goals = 0
+
+    match_details = []
+
+    for match in matches:
+        home = match['home_team']['name']
+        away = match['away_team']['name']
+        home_goals, away_goals = match_goals(match)
+
+        # Determine result from team1's perspective
+        if home == team1:
+            goals_for, goals_against = home_goals, away_goals
+        else:
+            goals_for, goals_against = away_goals, home_goals
+
+        team1_goals += goals_for
+        team2_goals += goals_against
+        if goals_for > goals_against:
+            team1_wins += 1
+            result = f"{team1} win"
+        elif goals_for < goals_against:
+            team2_wins += 1
+            result = f"{team2} win"
+        else:
+            draws += 1
+            result = "Draw"
+
+        match_details.append({
+            'date': format_date(match['date']),
+            'season': match['season'],
+            'home': home,
+            'away': away,
+            'score': f"{home_goals}-{away_goals}",
+            'result': result,
+            'league': match.get('league_name', 'Unknown')
+        })
+
+    total_matches = len(matches)
+
+    return {
+        'team1': team1,
+        'team2': team2,
+        'total_matches': total_matches,
+        'team1_wins': team1_wins,
+        'team2_wins': team2_wins,
+        'draws': draws,
+        'team1_goals': team1_goals,
+        'team2_goals': team2_goals,
+        'team1_win_pct': round((team1_wins / total_matches * 100), 1),
+        'team2_win_pct': round((team2_wins / total_matches * 100), 1),
+        'draw_pct': round((draws / total_matches * 100), 1),
+        'matches': match_details
+    }
@@ -0,0 +1,42 @@
+"""
+Query 2: Home vs Away Performance Analysis
+Shows how teams perform at home vs away
+"""
+
+from soccer_analytics.queries.backends import get_backend
+
+
+def home_away_performance(league_name, season, backend=None):
+    """Home vs away win rates and points per team, or None if no matches"""
+    backend = backend or get_backend()
+
+    results = []
+    for row in backend.team_season_stats(league_name, season):
+        home_win_pct = round((row['home_wins'] / row['home_played'] * 100), 1) if row['home_played'] > 0 else 0
+        away_win_pct = round((row['away_wins'] / row['away_played'] * 100), 1) if row['away_played'] > 0 else 0
+
+        results.append({
+            'team': row['team'],
+            'home_wins': row['home_wins'],
+            'home_played': row['home_played'],
+            'home_win_pct': home_win_pct,
+            'away_wins': row['away_wins'],
+            'away_played': row['away_played'],
+            'away_win_pct': away_win_pct,
+            'home_advantage': round(home_win_pct - away_win_pct, 1),
+            'home_points': row['home_wins'] * 3 + row['home_draws'],
+            'away_points': row['away_wins'] * 3 + row['away_draws']
+        })
+
+    if not results:
+        return None
+
+    # Sort by home advantage
+    results.sort(key=lambda x: (-x['home_advantage'], x['team']))
+
+    return {
+        'results': results,
+        'best_home': results[0],
+        'worst_home': results[-1],
+        'avg_advantage': round(sum(r['home_advantage'] for r in results) / len(results), 1)
+    }
@@ -0,0 +1,31 @@
+"""
+Query 4: Player Appearance Frequency
+Shows most frequently appearing players by league/season
+"""
+
+from soccer_analytics.queries.backends import get_backend
+
+REGULAR_APPEARANCES = 30
+
+
+def player_appearances(league_name, season, limit=15, backend=None):
+    """Players with the most appearances in a league season"""
+    backend = backend or get_backend()
+
+    player_stats = backend.player_appearances(league_name, season)
+
+    # Sort by appearances
+    top_players = sorted(player_stats, key=lambda x: (-x['appearances'], x['player']))[:limit]
+
+    return {
+        'players': [
+            {
+                'player': player['player'],
+                'appearances': player['appearances'],
+                'teams': ', '.join(player['teams'])
+            }
+            for player in top_players
+        ],
+        'total_matches': backend.count_matches(league_name, season),
+        'regulars_count': sum(1 for p in player_stats if p['appearances'] >= REGULAR_APPEARANCES)
+    }
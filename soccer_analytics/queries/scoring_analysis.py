@@ -0,0 +1,45 @@
+"""
+Query 6: High-Scoring and Low-Scoring Teams Analysis
+Offensive vs defensive team classification
+"""
+
+from soccer_analytics.queries.backends import get_backend
+
+
+def scoring_analysis(league_name, season, backend=None):
+    """Attack and defense rankings per team, or None if no matches"""
+    backend = backend or get_backend()
+
+    results = []
+    for row in backend.team_season_stats(league_name, season):
+        matches = row['home_played'] + row['away_played']
+        goals_scored = row['home_goals_for'] + row['away_goals_for']
+        goals_conceded = row['home_goals_against'] + row['away_goals_against']
+
+        results.append({
+            'team': row['team'],
+            'matches': matches,
+            'goals_scored': goals_scored,
+            'goals_conceded': goals_conceded,
+            'avg_scored': round(goals_scored / matches, 2),
+            'avg_conceded': round(goals_conceded / matches, 2),
+            'goal_diff': goals_scored - goals_conceded
+        })
+
+    if not results:
+        return None
+
+    best_attack = sorted(results, key=lambda x: (-x['avg_scored'], x['team']))
+    best_defense = sorted(results, key=lambda x: (x['avg_conceded'], x['team']))
+    worst_defense = sorted(results, key=lambda x: (-x['avg_conceded'], x['team']))
+
+    return {
+        'best_attack': best_attack,
+        'best_defense': best_defense,
+        'worst_defense': worst_defense,
+        'summary': {
+            'best_attack': best_attack[0],
+            'best_defense': best_defense[0],
+            'worst_defense': worst_defense[0]
+        }
+    }
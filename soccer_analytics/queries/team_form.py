@@ -0,0 +1,115 @@
+"""
+Query 5: Team Form Analysis
+Shows recent performance trends (last N games)
+"""
+
+from soccer_analytics.projections import FORM_FIELDS
+from soccer_analytics.queries.backends import get_backend, match_goals
+from soccer_analytics.queries.head_to_head import format_date
+
+
+def summarize_form(team_name, matches, last_n):
+    """Form summary for a team from its date-sorted matches"""
+    recent_matches = matches[-last_n:] if len(matches) >= last_n else matches
+
+    form_string = ""
+    wins = 0
+    draws = 0
+    losses = 0
+    goals_for = 0
+    goals_against = 0
+
+    match_details = []
+
+    for match in recent_matches:
+        home = match['home_team']['name']
+        away = match['away_team']['name']
+        home_goals, away_goals = match_goals(match)
+
+        # Determine result from team's perspective
+        if home == team_name:
+            scored, conceded = home_goals, away_goals
+            opponent = away
+            venue = "Home"
+        else:
+            scored, conceded = away_goals, home_goals
+            opponent = home
+            venue = "Away"
+
+        goals_for += scored
+        goals_against += conceded
+        if scored > conceded:
+            form_string += "W"
+            wins += 1
+            result = "Win"
+        elif scored < conceded:
+            form_string += "L"
+            losses += 1
+            result = "Loss"
+        else:
+            form_string += "D"
+            draws += 1
+            result = "Draw"
+
+        match_details.append({
+            'date': format_date(match['date']),
+            'opponent': opponent,
+            'venue': venue,
+            'score': f"{scored}-{conceded}",
+            'result': result
+        })
+
+    return {
+        'team': team_name,
+        'matches_analyzed': len(recent_matches),
+        'form': form_string,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'goals_for': goals_for,
+        'goals_against': goals_against,
+        'goal_diff': goals_for - goals_against,
+        'points': wins * 3 + draws,
+        'max_points': len(recent_matches) * 3,
+        'matches': match_details
+    }
+
+
+def team_form(team_name, league_name, season, last_n=10, backend=None):
+    """Recent form for one team, or None if it played no matches"""
+    backend = backend or get_backend()
+
+    matches = backend.find_matches({
+        'league_name': league_name,
+        'season': season,
+        '$or': [
+            {'home_team.name': team_name},
+            {'away_team.name': team_name}
+        ]
+    }, fields=FORM_FIELDS, sort=[('date', 1)])
+
+    if not matches:
+        return None
+
+    return summarize_form(team_name, matches, last_n)
+
+
+def league_form(league_name, season, last_n=5, backend=None):
+    """Recent form for every team in a league season from a single read"""
+    backend = backend or get_backend()
+
+    matches = backend.find_matches({
+        'league_name': league_name,
+        'season': season
+    }, fields=FORM_FIELDS, sort=[('date', 1)])
+
+    team_matches = {}
+    for match in matches:
+        team_matches.setdefault(match['home_team']['name'], []).append(match)
+        team_matches.setdefault(match['away_team']['name'], []).append(match)
+
+    all_forms = [summarize_form(team, team_matches[team], last_n) for team in team_matches]
+
+    # Sort by points in last N games
+    all_forms.sort(key=lambda x: (-x['points'], -x['goal_diff'], x['team']))
+    return all_forms
@@ -0,0 +1,42 @@
+"""
+Query 1: Team Performance by Season
+Calculates wins, draws, losses, goals, and points for each team
+"""
+
+from soccer_analytics.queries.backends import get_backend
+
+
+def team_performance(league_name, season, backend=None):
+    """League table plus top scoring team and best defense, or None if no matches"""
+    backend = backend or get_backend()
+
+    standings = []
+    for row in backend.team_season_stats(league_name, season):
+        wins = row['home_wins'] + row['away_wins']
+        draws = row['home_draws'] + row['away_draws']
+        goals_for = row['home_goals_for'] + row['away_goals_for']
+        goals_against = row['home_goals_against'] + row['away_goals_against']
+
+        standings.append({
+            'team': row['team'],
+            'played': row['home_played'] + row['away_played'],
+            'wins': wins,
+            'draws': draws,
+            'losses': row['home_losses'] + row['away_losses'],
+            'goals_for': goals_for,
+            'goals_against': goals_against,
+            'goal_diff': goals_for - goals_against,
+            'points': wins * 3 + draws
+        })
+
+    if not standings:
+        return None
+
+    # Sort by points, then goal difference
+    standings.sort(key=lambda x: (-x['points'], -x['goal_diff'], x['team']))
+
+    return {
+        'standings': standings,
+        'top_scorer': min(standings, key=lambda x: (-x['goals_for'], x['team'])),
+        'best_defense': min(standings, key=lambda x: (x['goals_against'], x['team']))
+    }
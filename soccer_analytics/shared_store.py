@@ -0,0 +1,81 @@
+"""
+Shared array snapshots
+Publishes a set of NumPy arrays plus JSON metadata as .npy files, one
+directory per snapshot name and data version. Every process that attaches
+maps the same files read-only (np.load with mmap_mode='r'), so the OS page
+cache holds a single copy no matter how many WSGI workers are running.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+METADATA_FILE = 'metadata.json'
+
+
+def snapshot_path(root, name, version):
+    """Directory holding one published snapshot"""
+    return os.path.join(root, f'{name}-v{version}')
+
+
+def publish(root, name, version, arrays, metadata):
+    """
+    Write a snapshot atomically and remove older versions of it
+    The files are written to a temporary directory and renamed into place;
+    if another process published the same version first, its copy is kept.
+    Returns the snapshot directory.
+    """
+    path = snapshot_path(root, name, version)
+    if not os.path.isdir(path):
+        os.makedirs(root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{name}-', dir=root)
+        try:
+            for key, array in arrays.items():
+                np.save(os.path.join(staging, f'{key}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+            with open(os.path.join(staging, METADATA_FILE), 'w') as f:
+                json.dump(metadata, f)
+            try:
+                os.rename(staging, path)
+            except OSError:
+                # Lost the race to another worker; its snapshot is identical
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    # Processes still mapping an old version keep their pages until they reload
+    current = os.path.basename(path)
+    for entry in os.listdir(root):
+        if entry.startswith(f'{name}-v') and entry != current:
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    return path
+
+
+def published_version(root, name):
+    """Version of the snapshot currently published under a name, or None"""
+    if not os.path.isdir(root):
+        return None
+    prefix = f'{name}-v'
+    versions = [entry[len(prefix):] for entry in os.listdir(root) if entry.startswith(prefix)]
+    if not versions:
+        return None
+    # publish() keeps one version per name; prefer the newest if a reload raced it
+    return max(versions, key=lambda version: (version.isdigit(), int(version) if version.isdigit() else 0))
+
+
+def attach(root, name, version):
+    """Memory-map a published snapshot: (arrays, metadata), or None if absent"""
+    path = snapshot_path(root, name, version)
+    if not os.path.isdir(path):
+        return None
+
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    arrays = {
+        entry[:-len('.npy')]: np.load(os.path.join(path, entry), mmap_mode='r', allow_pickle=False)
+        for entry in os.listdir(path) if entry.endswith('.npy')
+    }
+    return arrays, metadata
@@ -0,0 +1,126 @@
+"""
+As-of team attributes
+Team attributes are dated FIFA snapshots. AttributeTimelines holds every
+snapshot of every team in date order and joins each match to the snapshot
+that was current on its date, so features for past matches never use
+ratings published after the match was played.
+"""
+
+import bisect
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from soccer_analytics.projections import TEAM_ATTRIBUTE_HISTORY_FIELDS
+
+ATTRIBUTE_FIELDS = ('buildUpPlaySpeed', 'defencePressure', 'chanceCreationShooting', 'defenceAggression')
+DEFAULT_ATTRIBUTE = 50
+
+
+def _values(snapshot):
+    return [snapshot.get(field, DEFAULT_ATTRIBUTE) for field in ATTRIBUTE_FIELDS]
+
+
+def as_datetimes(values):
+    """datetime64[ns] array; missing and unparsed (string) dates become NaT"""
+    return pd.to_datetime(pd.Series(
+        [value if isinstance(value, datetime) else None for value in values], dtype=object
+    )).to_numpy(dtype='datetime64[ns]')
+
+
+def snapshot_at(history, date=None, first_snapshot_fallback=False):
+    """
+    Entry of one team's attributes_history current on a date
+    Without a date the latest entry is returned. A date before the first
+    dated snapshot gives {} (so every attribute reads as DEFAULT_ATTRIBUTE),
+    or the first snapshot with first_snapshot_fallback - the former
+    behaviour, which uses ratings published after that date. An empty
+    history gives {}.
+    """
+    if not history:
+        return {}
+    dated = [entry for entry in history if isinstance(entry.get('date'), datetime)]
+    if not isinstance(date, datetime) or not dated:
+        return history[-1]
+    position = bisect.bisect_right([entry['date'] for entry in dated], date) - 1
+    if position < 0:
+        return dated[0] if first_snapshot_fallback else {}
+    return dated[position]
+
+
+class AttributeTimelines:
+    """Every dated attribute snapshot of every team, joined to matches as of their date"""
+
+    def __init__(self, snapshots, latest):
+        # team_api_id, date and ATTRIBUTE_FIELDS, sorted by date (merge_asof needs it)
+        self.snapshots = snapshots.sort_values('date', kind='stable', ignore_index=True)
+        # ATTRIBUTE_FIELDS indexed by team_api_id: each team's last history entry
+        self.latest = latest
+        self.first = self.snapshots.groupby('team_api_id', sort=False)[list(ATTRIBUTE_FIELDS)].first()
+
+    @classmethod
+    def from_teams(cls, teams):
+        """Build from team documents carrying attributes_history (in date order)"""
+        rows, latest = [], {}
+        for team in teams:
+            history = team.get('attributes_history')
+            if not history:
+                continue
+            team_id = team['team_api_id']
+            for entry in history:
+                if isinstance(entry.get('date'), datetime):
+                    rows.append([team_id, entry['date']] + _values(entry))
+            latest[team_id] = _values(history[-1])
+
+        fields = list(ATTRIBUTE_FIELDS)
+        snapshots = pd.DataFrame(rows, columns=['team_api_id', 'date'] + fields)
+        snapshots['team_api_id'] = snapshots['team_api_id'].astype(np.int64)
+        snapshots['date'] = as_datetimes(snapshots['date'])
+        snapshots[fields] = snapshots[fields].fillna(DEFAULT_ATTRIBUTE)
+        latest = pd.DataFrame.from_dict(latest, orient='index', columns=fields).fillna(DEFAULT_ATTRIBUTE)
+        return cls(snapshots, latest)
+
+    @classmethod
+    def load(cls, db):
+        """Read the attribute history of every team"""
+        return cls.from_teams(db.teams.find({}, TEAM_ATTRIBUTE_HISTORY_FIELDS))
+
+    def known(self, team_ids):
+        """Boolean mask of the team ids that have attributes"""
+        return pd.Series(team_ids, dtype=object).isin(self.latest.index).to_numpy()
+
+    def as_of(self, team_ids, dates, first_snapshot_fallback=False):
+        """
+        Attributes of each team on each date, one positional row per pair
+        Missing dates get the team's latest snapshot. Dates before a team's
+        first snapshot get DEFAULT_ATTRIBUTE, or that first snapshot with
+        first_snapshot_fallback (the former behaviour, which leaks ratings
+        published after the match). Teams without attributes are NaN.
+        """
+        fields = list(ATTRIBUTE_FIELDS)
+        requests = pd.DataFrame({
+            'team_api_id': np.asarray(team_ids, dtype=np.int64),
+            'date': as_datetimes(dates),
+            'row': np.arange(len(team_ids))
+        })
+        undated = requests['date'].isna().to_numpy()
+
+        values = np.full((len(requests), len(fields)), np.nan)
+        dated = requests[~undated].sort_values('date', kind='stable')
+        if len(dated) and len(self.snapshots):
+            joined = pd.merge_asof(dated, self.snapshots, on='date', by='team_api_id', direction='backward')
+            values[joined['row'].to_numpy()] = joined[fields].to_numpy(dtype=np.float64)
+
+        latest = self.latest.reindex(requests['team_api_id']).to_numpy(dtype=np.float64)
+        first = self.first.reindex(requests['team_api_id']).to_numpy(dtype=np.float64)
+        values[undated] = latest[undated]
+        early = np.isnan(values).any(axis=1) & requests['team_api_id'].isin(self.first.index).to_numpy()
+        values[early] = first[early] if first_snapshot_fallback else DEFAULT_ATTRIBUTE
+        # Teams whose snapshots are all undated only have a latest entry
+        values = np.where(np.isnan(values), latest, values)
+
+        result = pd.DataFrame(values, columns=fields)
+        if not np.isnan(values).any():
+            result = result.astype(self.latest.dtypes.to_dict())
+        return result
@@ -0,0 +1,185 @@
+"""
+Materialized per-team, per-league-season statistics
+The team_season_stats collection holds one document per (league_name,
+season, team) with the home/away counters that queries 1, 2 and 6 read.
+It is built in full at import time and kept current afterwards by
+applying match results as $inc deltas.
+"""
+
+from pymongo import UpdateOne
+
+from soccer_analytics import data_version
+from soccer_analytics.projections import RESULT_FIELDS
+
+COLLECTION = 'team_season_stats'
+
+KEY_FIELDS = ['league_name', 'season', 'team']
+
+TEAM_STAT_COUNTERS = [
+    'home_played', 'home_wins', 'home_draws', 'home_losses',
+    'home_goals_for', 'home_goals_against',
+    'away_played', 'away_wins', 'away_draws', 'away_losses',
+    'away_goals_for', 'away_goals_against'
+]
+
+
+def empty_team_stats(team):
+    """Zeroed per-team counters for one league season"""
+    row = {'team': team}
+    for counter in TEAM_STAT_COUNTERS:
+        row[counter] = 0
+    return row
+
+
+def match_goals(match):
+    """Return (home_goals, away_goals) treating missing scores as 0"""
+    return match.get('home_team_goal') or 0, match.get('away_team_goal') or 0
+
+
+def venue_group(venue, group_id, goals_for, goals_against):
+    """$group stage tallying one side (home or away) of every match"""
+    return {'$group': {
+        '_id': group_id,
+        f'{venue}_played': {'$sum': 1},
+        f'{venue}_wins': {'$sum': {'$cond': [{'$gt': [goals_for, goals_against]}, 1, 0]}},
+        f'{venue}_draws': {'$sum': {'$cond': [{'$eq': [goals_for, goals_against]}, 1, 0]}},
+        f'{venue}_losses': {'$sum': {'$cond': [{'$lt': [goals_for, goals_against]}, 1, 0]}},
+        f'{venue}_goals_for': {'$sum': goals_for},
+        f'{venue}_goals_against': {'$sum': goals_against}
+    }}
+
+
+def create_indexes(db):
+    """Unique lookup key: every read is one league season"""
+    db[COLLECTION].create_index(
+        [('league_name', 1), ('season', 1), ('team', 1)],
+        unique=True
+    )
+
+
+def build(db):
+    """Rebuild the whole collection from the matches collection"""
+    season_key = {'league_name': '$league_name', 'season': '$season'}
+    pipeline = [
+        {'$project': {
+            '_id': 0,
+            'league_name': 1,
+            'season': 1,
+            'home': '$home_team.name',
+            'away': '$away_team.name',
+            'home_goals': {'$ifNull': ['$home_team_goal', 0]},
+            'away_goals': {'$ifNull': ['$away_team_goal', 0]}
+        }},
+        {'$facet': {
+            'home': [venue_group('home', dict(season_key, team='$home'), '$home_goals', '$away_goals')],
+            'away': [venue_group('away', dict(season_key, team='$away'), '$away_goals', '$home_goals')]
+        }},
+        {'$project': {'rows': {'$concatArrays': ['$home', '$away']}}},
+        {'$unwind': '$rows'},
+        {'$replaceRoot': {'newRoot': '$rows'}},
+        {'$group': dict(
+            {'_id': '$_id'},
+            **{counter: {'$sum': f'${counter}'} for counter in TEAM_STAT_COUNTERS}
+        )},
+        {'$project': dict(
+            {'_id': 0},
+            **{field: f'$_id.{field}' for field in KEY_FIELDS},
+            **{counter: 1 for counter in TEAM_STAT_COUNTERS}
+        )},
+        {'$out': COLLECTION}
+    ]
+
+    db.matches.aggregate(pipeline)
+    create_indexes(db)
+    return db[COLLECTION].count_documents({})
+
+
+def match_deltas(match, sign=1):
+    """
+    Counter increments contributed by one match document
+    Returns [(key, inc), (key, inc)] for the home and the away team;
+    sign=-1 gives the increments that remove the match again.
+    """
+    home_goals, away_goals = match_goals(match)
+    deltas = []
+
+    for venue, team, goals_for, goals_against in (
+        ('home', match['home_team']['name'], home_goals, away_goals),
+        ('away', match['away_team']['name'], away_goals, home_goals)
+    ):
+        if goals_for > goals_against:
+            outcome = 'wins'
+        elif goals_for == goals_against:
+            outcome = 'draws'
+        else:
+            outcome = 'losses'
+
+        key = (match['league_name'], match['season'], team)
+        deltas.append((key, {
+            f'{venue}_played': sign,
+            f'{venue}_{outcome}': sign,
+            f'{venue}_goals_for': sign * goals_for,
+            f'{venue}_goals_against': sign * goals_against
+        }))
+
+    return deltas
+
+
+def apply_match_changes(db, changes):
+    """
+    Apply new, corrected or removed match results as deltas
+    changes is an iterable of (old_match, new_match) pairs: old_match is
+    None for a new match and new_match is None for a removed one. Both
+    need league_name, season, home_team.name, away_team.name and goals.
+    Returns the number of team-season rows touched.
+    """
+    totals = {}
+    for old_match, new_match in changes:
+        deltas = []
+        if old_match is not None:
+            deltas += match_deltas(old_match, sign=-1)
+        if new_match is not None:
+            deltas += match_deltas(new_match)
+
+        for key, inc in deltas:
+            row = totals.setdefault(key, {})
+            for counter, value in inc.items():
+                row[counter] = row.get(counter, 0) + value
+
+    operations = []
+    for key, inc in totals.items():
+        if any(inc.values()):
+            # Increment every counter (most by 0) so upserted rows are complete
+            inc = {counter: inc.get(counter, 0) for counter in TEAM_STAT_COUNTERS}
+            operations.append(UpdateOne(dict(zip(KEY_FIELDS, key)), {'$inc': inc}, upsert=True))
+
+    if operations:
+        db[COLLECTION].bulk_write(operations, ordered=False)
+        # A team-season whose last match was removed disappears again
+        db[COLLECTION].delete_many({'home_played': {'$lte': 0}, 'away_played': {'$lte': 0}})
+
+    return len(operations)
+
+
+def record_match_result(db, match_api_id, home_goals, away_goals):
+    """Set the score of a stored match and update team_season_stats in place"""
+    old_match = db.matches.find_one({'match_api_id': match_api_id}, RESULT_FIELDS)
+    if old_match is None:
+        raise ValueError(f"Unknown match_api_id: {match_api_id}")
+
+    db.matches.update_one(
+        {'match_api_id': match_api_id},
+        {'$set': {'home_team_goal': home_goals, 'away_team_goal': away_goals}}
+    )
+
+    new_match = dict(old_match, home_team_goal=home_goals, away_team_goal=away_goals)
+    touched = apply_match_changes(db, [(old_match, new_match)])
+    data_version.bump(db, 'result correction')
+    return touched
+
+
+def read(db, league_name, season):
+    """Stored rows for one league season, sorted by team"""
+    fields = dict({'_id': 0, 'team': 1}, **{counter: 1 for counter in TEAM_STAT_COUNTERS})
+    cursor = db[COLLECTION].find({'league_name': league_name, 'season': season}, fields)
+    return list(cursor.sort('team', 1))